@@ -0,0 +1,254 @@
+import argparse
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+import yaml
+from src.documentation import write_yaml_list
+from src.parse_doxygen import parse_calc_documentation, parse_object_documentation
+from src.snippets import generate_snippets
+
+public_path = Path(__file__).parent.parent / "packages/septic/public"
+baseline_path = Path(__file__).parent / "benchmark_baseline.json"
+fixture_version = "v3_8"
+filler = "\n".join(f"int f{i}(int x) {{ return x * {i}; }}" for i in range(20))
+plain_files_per_scale = 60
+
+
+def format_list(values: List[str]) -> str:
+    return "[" + ", ".join(values) + "]"
+
+
+def format_text(text: str) -> str:
+    return text.replace("\\", "").replace("{", "(").replace("}", ")")
+
+
+def render_attribute(attr: dict) -> str:
+    datatype = attr["dataType"] or "none"
+    if attr["enums"]:
+        datatype = "Enum" + format_list(attr["enums"])
+    elif attr["list"] == "true":
+        datatype += "[]"
+    details = [f"datatype: {datatype}"]
+    default = attr["default"]
+    if default:
+        details.append(
+            "default: " + (format_list(default) if len(default) > 1 else default[0])
+        )
+    if attr["postfix"]:
+        details.append("postfix: " + format_list(attr["postfix"]))
+    if attr.get("snippet"):
+        details.append("snippet: '" + attr["snippet"].replace("\n", "\\n") + "'")
+    for key, flag in (
+        ("calc", "calc"),
+        ("noCnfg", "nocnfg"),
+        ("nosnippet", "nosnippet"),
+    ):
+        if attr.get(key) == "true":
+            details.append(flag)
+    line = f"  \\param {attr['name']} {format_text(attr['description'])} {{{'; '.join(details)}}}"
+    if attr["tags"]:
+        line += " " + format_list(attr["tags"])
+    return line
+
+
+def render_object(obj: dict, name: str) -> str:
+    lines = ["/*!", f"  \\vscode {name}", ""]
+    lines.append("  \\brief " + format_text(obj["description"]))
+    lines.append("")
+    lines.extend(render_attribute(attr) for attr in obj["attributes"])
+    lines.append("")
+    if obj["parents"]:
+        lines.append("  \\containers " + format_list(obj["parents"]))
+    lines.append("*/")
+    return "\n".join(lines)
+
+
+def render_calc(calc: dict, name: str) -> str:
+    signature = name + calc["signature"][len(calc["name"]) :]
+    lines = ["/*!", f"  \\class Calc{name}", f"  \\calc{{{signature}}}", ""]
+    for param in calc["parameters"]:
+        lines.append(
+            f"  \\param[{param['direction']}] {param['name']} {format_text(param['description'])} "
+            f"{{datatype: {format_list(param['datatype'])}; arity: {param['arity']}}}"
+        )
+    lines.append("")
+    lines.append("  \\return " + format_text(calc["retr"]))
+    lines.append("")
+    lines.append("  \\details " + format_text(calc["detailedDescription"]))
+    lines.append("")
+    lines.append("  \\quality " + format_text(calc["quality"]))
+    lines.append("*/")
+    return "\n".join(lines)
+
+
+def copy_name(name: str, copy: int) -> str:
+    return name if copy == 0 else f"{name}{copy}"
+
+
+def create_fixture(scale: int, version: str = fixture_version) -> Tuple[List[str], str]:
+    """Synthetic SEPTIC sources rendered from the documentation of a version"""
+    version_path = public_path / version
+    with open(version_path / "objectsDoc.yaml") as file:
+        objects = yaml.load(file, Loader=yaml.BaseLoader)
+    with open(version_path / "calcs.yaml") as file:
+        calcs = yaml.load(file, Loader=yaml.BaseLoader)
+    object_files = []
+    calc_blocks = []
+    for copy in range(scale):
+        for obj in objects:
+            block = render_object(obj, copy_name(obj["name"], copy))
+            object_files.append(f"{filler}\n{block}\n{filler}\n")
+        object_files.extend(f"{filler}\n" for _ in range(plain_files_per_scale))
+        calc_blocks.extend(
+            render_calc(calc, copy_name(calc["name"], copy)) for calc in calcs
+        )
+    return object_files, "\n".join(calc_blocks) + "\n"
+
+
+def parse_objects(object_files: List[str]):
+    objects = []
+    for file in object_files:
+        objects.extend(parse_object_documentation(file))
+    objects.sort(key=lambda x: x.name)
+    return objects
+
+
+def parse_calcs(calc_file: str):
+    calcs = parse_calc_documentation(calc_file)
+    calcs.sort(key=lambda x: x.name)
+    return calcs
+
+
+def run_stages(scale: int, work_path: Path, measure: Callable[[str, Callable], None]):
+    object_files, calc_file = create_fixture(scale)
+    version_path = work_path / str(scale)
+    version_path.mkdir(parents=True, exist_ok=True)
+    objects = parse_objects(object_files)
+    calcs = parse_calcs(calc_file)
+    measure("parse_objects", lambda: parse_objects(object_files))
+    measure("parse_calcs", lambda: parse_calcs(calc_file))
+
+    def dump_yaml():
+        write_yaml_list(objects, version_path / "objectsDoc.yaml")
+        write_yaml_list(calcs, version_path / "calcs.yaml")
+
+    measure("dump_yaml", dump_yaml)
+    measure("generate_snippets", lambda: generate_snippets(str(scale), work_path))
+
+
+def benchmark(scale: int, repeat: int, work_path: Path) -> Dict[str, dict]:
+    results = {}
+
+    def measure_time(stage: str, run: Callable):
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            times.append(time.perf_counter() - start)
+        results[stage] = {"time": min(times)}
+
+    def measure_memory(stage: str, run: Callable):
+        tracemalloc.start()
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[stage]["peak_memory"] = peak
+
+    run_stages(scale, work_path, measure_time)
+    run_stages(scale, work_path, measure_memory)
+    return results
+
+
+def find_regressions(
+    results: Dict[str, dict], baseline: Dict[str, dict], threshold: float
+) -> List[str]:
+    regressions = []
+    for scale, stages in results.items():
+        for stage, result in stages.items():
+            expected = baseline.get(scale, {}).get(stage)
+            if not expected:
+                continue
+            for metric, value in result.items():
+                limit = expected[metric] * (1 + threshold)
+                if value > limit:
+                    regressions.append(
+                        f"{stage} ({scale}x): {metric} {value:.4g} exceeds baseline {expected[metric]:.4g} by more than {threshold:.0%}"
+                    )
+    return regressions
+
+
+def print_results(results: Dict[str, dict], baseline: Dict[str, dict]):
+    print(
+        f"{'stage':<20}{'scale':>6}{'time (s)':>12}{'peak (MB)':>12}{'vs baseline':>14}"
+    )
+    for scale, stages in results.items():
+        for stage, result in stages.items():
+            expected = baseline.get(scale, {}).get(stage)
+            change = (
+                f"{result['time'] / expected['time'] - 1:+.0%}" if expected else "-"
+            )
+            print(
+                f"{stage:<20}{scale + 'x':>6}{result['time']:>12.4f}"
+                f"{result['peak_memory'] / 1024 / 1024:>12.1f}{change:>14}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark the documentation pipeline on synthetic SEPTIC sources"
+    )
+    parser.add_argument(
+        "--scales",
+        type=int,
+        nargs="+",
+        default=[1, 10],
+        help="Number of copies of the fixture documentation to benchmark, e.g. 1 10 100 (default: 1 10)",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="Number of timed runs of each stage, the fastest is reported (default: 3)",
+    )
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        default=baseline_path,
+        help=f"Baseline file to compare with (default: {baseline_path.name})",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Store the results as the new baseline",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Allowed relative increase over the baseline before failing (default: 0.2)",
+    )
+    args = parser.parse_args()
+    baseline = {}
+    if args.baseline.exists():
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in args.scales:
+            results[str(scale)] = benchmark(scale, max(args.repeat, 1), Path(tmp))
+    print_results(results, baseline)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump({**baseline, **results}, f, indent=2)
+        print(f"Saved baseline to {args.baseline}")
+        sys.exit(0)
+    regressions = find_regressions(results, baseline, args.threshold)
+    for regression in regressions:
+        print(regression)
+    if regressions:
+        sys.exit(1)
@@ -0,0 +1,66 @@
+"""
+Compare the documentation of SEPTIC versions
+
+Reports the objects, attributes, calcs and parameters that were added,
+removed or changed between two version folders, or between each pair of
+consecutive version folders with --all.
+
+Usage:
+    python scripts/diff_versions.py v3_7 v3_8
+    python scripts/diff_versions.py --all --json
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from src.diff import diff_versions, format_report, read_version
+from src.parse_doxygen import RecordPool
+from src.versioning import folder_sort_key, get_versions
+
+output_path = Path("packages/septic/public")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare the documentation of SEPTIC versions"
+    )
+    parser.add_argument(
+        "versions",
+        nargs="*",
+        help="Version folders to compare, e.g. v3_7 v3_8",
+    )
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="Compare each pair of consecutive version folders",
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print the changes as JSON",
+    )
+    parser.add_argument(
+        "--path",
+        type=Path,
+        default=output_path,
+        help=f"Folder with the versions (default: {output_path})",
+    )
+    args = parser.parse_args()
+    if args.all:
+        versions = sorted(get_versions(args.path), key=folder_sort_key)
+    elif len(args.versions) == 2:
+        versions = args.versions
+    else:
+        parser.error("Give two versions to compare or use --all")
+    # Records that are the same in several versions are only held once
+    pool = RecordPool()
+    documentation = [read_version(args.path, version, pool) for version in versions]
+    reports = [
+        diff_versions(old, new) for old, new in zip(documentation, documentation[1:])
+    ]
+    if args.json:
+        json.dump(reports if args.all else reports[0], sys.stdout, indent=2)
+        print()
+    else:
+        print("\n\n".join(format_report(report) for report in reports))
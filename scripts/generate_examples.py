@@ -6,34 +6,51 @@ and creates individual .cnfg example files for each object type in the
 examples folder.
 
 Usage:
-    python generate_examples.py [version]
+    python generate_examples.py [version ...]
 
 Arguments:
-    version: Septic version folder to use (default: 'latest')
+    version: Septic version folder(s) to use (default: 'latest')
              Examples: 'latest', 'v2_88', 'v2_89', 'v3_0', etc.
+             When several versions are given, the examples of each version
+             are generated concurrently into a subfolder of the output
+             directory named after the version.
 """
 
 import argparse
+import hashlib
+import os
 import re
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Dict, Any
 
 import yaml
 
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+
+default_output_dir = "packages/extension/skills/writing-septic-config/objects"
+
+# Matches ${n:text}, ${n|option1,option2|} and ${n}
+placeholder_regex = re.compile(r"\$\{\d+(?::([^}]+)|\|([^,|]+)[^}]*)?\}")
+
+
+def replace_placeholder(match: re.Match) -> str:
+    return match.group(1) or match.group(2) or ""
+
 
 def remove_snippet_placeholders(text: str) -> str:
     """
     Remove VSCode snippet placeholders like ${1:Name}, ${2}, etc.
     and replace them with the default values or generic placeholders.
     """
-    # Replace ${n:text} with text
-    text = re.sub(r"\$\{(\d+):([^}]+)\}", r"\2", text)
-    # Replace ${n} with empty string
-    text = re.sub(r"\$\{\d+\}", "", text)
-    # Replace ${n|option1,option2|} with option1
-    text = re.sub(r"\$\{\d+\|([^,|]+)[^}]*\}", r"\1", text)
-    return text
+    # ${n:text} becomes text, ${n|option1,option2|} becomes option1 and
+    # ${n} is removed
+    return placeholder_regex.sub(replace_placeholder, text)
 
 
 def clean_snippet_body(body: List[str]) -> str:
@@ -49,9 +66,17 @@ def clean_snippet_body(body: List[str]) -> str:
     return "\n".join(cleaned_lines)
 
 
-def generate_example_file(snippet: Dict[str, Any], output_dir: Path) -> None:
+def file_digest(file_path: Path) -> bytes:
+    with open(file_path, "rb") as f:
+        return hashlib.sha256(f.read()).digest()
+
+
+def generate_example_file(snippet: Dict[str, Any], output_dir: Path) -> str:
     """
     Generate a single example .cnfg file from a snippet definition.
+    The file is only written if its content changed.
+
+    Returns "written", "unchanged" or "skipped".
     """
     prefix = snippet.get("prefix", "")
     description = snippet.get("description", "")
@@ -59,7 +84,7 @@ def generate_example_file(snippet: Dict[str, Any], output_dir: Path) -> None:
 
     if not prefix or not body:
         print(f"Skipping snippet without prefix or body: {snippet}")
-        return
+        return "skipped"
 
     # Create file name from prefix
     file_name = f"{prefix}.cnfg"
@@ -72,61 +97,35 @@ def generate_example_file(snippet: Dict[str, Any], output_dir: Path) -> None:
     header = f"// {description}\n" if description else ""
     full_content = header + content + "\n"
 
-    # Write to file
-    with open(file_path, "w", encoding="utf-8") as f:
-        f.write(full_content)
-
-    print(f"Generated: {file_name}")
+    # Leave the file untouched if it already has this content
+    data = full_content.replace("\n", os.linesep).encode("utf-8")
+    if file_path.exists() and file_digest(file_path) == hashlib.sha256(data).digest():
+        return "unchanged"
 
+    # Write to file
+    file_path.write_bytes(data)
 
-def main():
-    parser = argparse.ArgumentParser(
-        description="Generate example .cnfg files from snippets.yaml"
-    )
-    parser.add_argument(
-        "version",
-        nargs="?",
-        default="latest",
-        help="Septic version folder to use (default: latest)",
-    )
-    parser.add_argument(
-        "--output",
-        "-o",
-        default="packages/extension/skills/writing-septic-config/objects",
-        help="Output directory for example files (default: packages/extension/skills/writing-septic-config/objects)",
-    )
-
-    args = parser.parse_args()
+    print(f"Generated: {file_path}")
+    return "written"
 
-    # Construct paths
-    script_dir = Path(__file__).parent
-    project_root = script_dir.parent
-    snippets_path = (
-        project_root / "packages" / "septic" / "public" / args.version / "snippets.yaml"
-    )
-    output_dir = project_root / args.output
 
-    # Validate snippets file exists
-    if not snippets_path.exists():
-        print(f"Error: snippets.yaml not found at {snippets_path}")
-        print(f"Available versions:")
-        public_dir = project_root / "packages" / "septic" / "public"
-        for version_dir in sorted(public_dir.iterdir()):
-            if version_dir.is_dir():
-                print(f"  - {version_dir.name}")
-        sys.exit(1)
+def generate_examples(snippets_path: Path, output_dir: Path) -> Dict[str, int]:
+    """
+    Generate the example files of one version and remove files of
+    snippets that no longer exist.
 
+    Returns the number of written, unchanged and removed files.
+    """
     # Create output directory if it doesn't exist
     output_dir.mkdir(parents=True, exist_ok=True)
 
     # Read snippets.yaml
     print(f"Reading snippets from: {snippets_path}")
     with open(snippets_path, "r", encoding="utf-8") as f:
-        snippets = yaml.safe_load(f)
+        snippets = yaml.load(f, Loader=SafeLoader)
 
     if not isinstance(snippets, list):
-        print("Error: snippets.yaml should contain a list of snippets")
-        sys.exit(1)
+        raise ValueError(f"{snippets_path} should contain a list of snippets")
 
     # Get list of expected file names from snippets
     expected_files = set()
@@ -135,29 +134,80 @@ def main():
         if prefix:
             expected_files.add(f"{prefix}.cnfg")
 
+    counts = {"written": 0, "unchanged": 0, "removed": 0}
+
     # Remove files that are not in the snippets list
-    existing_files = list(output_dir.glob("*.cnfg"))
-    removed_count = 0
-    for file_path in existing_files:
+    for file_path in output_dir.glob("*.cnfg"):
         if file_path.name not in expected_files:
-            print(f"Removing: {file_path.name}")
+            print(f"Removing: {file_path}")
             file_path.unlink()
-            removed_count += 1
-
-    if removed_count > 0:
-        print(f"Removed {removed_count} file(s) not in snippets list")
-        print()
+            counts["removed"] += 1
 
     # Generate example files
-    print(f"Generating example files in: {output_dir}")
-    print(f"Total snippets: {len(snippets)}")
-    print()
-
     for snippet in snippets:
-        generate_example_file(snippet, output_dir)
+        status = generate_example_file(snippet, output_dir)
+        if status in counts:
+            counts[status] += 1
+
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate example .cnfg files from snippets.yaml"
+    )
+    parser.add_argument(
+        "versions",
+        nargs="*",
+        default=["latest"],
+        help="Septic version folder(s) to use (default: latest)",
+    )
+    parser.add_argument(
+        "--output",
+        "-o",
+        default=default_output_dir,
+        help=f"Output directory for example files, with a subfolder per version if several versions are given (default: {default_output_dir})",
+    )
+
+    args = parser.parse_args()
+
+    # Construct paths
+    script_dir = Path(__file__).parent
+    project_root = script_dir.parent
+    public_dir = project_root / "packages" / "septic" / "public"
+    output_dir = project_root / args.output
+
+    # Validate snippets files exist
+    jobs = []
+    for version in args.versions:
+        snippets_path = public_dir / version / "snippets.yaml"
+        if not snippets_path.exists():
+            print(f"Error: snippets.yaml not found at {snippets_path}")
+            print(f"Available versions:")
+            for version_dir in sorted(public_dir.iterdir()):
+                if version_dir.is_dir():
+                    print(f"  - {version_dir.name}")
+            sys.exit(1)
+        version_output_dir = (
+            output_dir / version if len(args.versions) > 1 else output_dir
+        )
+        jobs.append((snippets_path, version_output_dir))
+
+    # Generate the versions concurrently
+    with ThreadPoolExecutor() as executor:
+        futures = [executor.submit(generate_examples, *job) for job in jobs]
+        try:
+            results = [future.result() for future in futures]
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
 
     print()
-    print(f"Done! Generated {len(snippets)} example files.")
+    for version, (_, version_output_dir), counts in zip(args.versions, jobs, results):
+        print(
+            f"{version}: {counts['written']} written, {counts['unchanged']} unchanged, "
+            f"{counts['removed']} removed in {version_output_dir}"
+        )
 
 
 if __name__ == "__main__":
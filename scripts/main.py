@@ -1,19 +1,50 @@
+import argparse
+import cProfile
+import hashlib
 import json
+import multiprocessing
 import os
-import sys
-from dataclasses import asdict
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Union
+from typing import List, Optional, Union
 
 import yaml
-from src.github import get_calc_file, get_commit_id, get_object_files, get_tags
-from src.parse_doxygen import (
-    SepticObject,
-    parse_calc_documentation,
-    parse_object_documentation,
-    test_calc,
+from generate_examples import default_output_dir, generate_examples
+from src.cache import (
+    parse_cache,
+    response_cache,
+    source_cache,
+    submit_calc_documentation,
+    submit_object_documentation,
+)
+from src.bundle import rebuild_bundle, write_bundle
+from src.deltas import deltas_folder_name, write_deltas
+from src.documentation import to_value, write_yaml_list
+from src.calc_index import (
+    build_calc_index,
+    calc_index_file_name,
+    rebuild_calc_index,
+    write_calc_index,
+)
+from src.hierarchy import (
+    build_hierarchy,
+    hierarchy_file_name,
+    rebuild_hierarchy,
+    write_hierarchy,
+)
+from src.parse_doxygen import test_calc
+from src.pipeline import bounded_futures
+from src.prefilter import prefilter_stats
+from src.profiling import profile_file_name, profiler
+from src.snippets import generate_all_snippets, generate_snippets
+from src.sources import (
+    ContentsSource,
+    LocalSource,
+    Source,
+    get_source,
+    unknown_commit,
 )
-from src.snippets import generate_snippets
 from src.versioning import (
     folder_name_to_option,
     get_existing_versions,
@@ -21,7 +52,11 @@ from src.versioning import (
     get_newest_version_for_major,
     get_versions,
     get_versions_from_tag,
+    manifest_name,
     meta_info_name,
+    read_meta_file,
+    rebuild_manifest,
+    update_manifest,
     version_to_folder_name,
 )
 
@@ -29,37 +64,54 @@ output_path = Path("packages/septic/public")
 object_file_name = "objectsDoc.yaml"
 calc_file_name = "calcs.yaml"
 first_valid_version = (2, 88)
+source: Source = ContentsSource()
+force = False
+jobs = 1
+executor: Optional[ProcessPoolExecutor] = None
+updated_folders: List[Path] = []
+
+
+def get_inputs_hash() -> str:
+    script_path = Path(__file__).resolve()
+    files = [script_path] + sorted((script_path.parent / "src").glob("*.py"))
+    digest = hashlib.sha256()
+    for f in files:
+        digest.update(f.read_bytes())
+    return digest.hexdigest()[0:16]
+
+
+inputs_hash = get_inputs_hash()
+
+
+def is_up_to_date(commit: str, meta_path: Path) -> bool:
+    if force or commit == unknown_commit or not meta_path.exists():
+        return False
+    meta = read_meta_file(meta_path)
+    return meta.get("commit") == commit[0:7] and meta.get("inputs") == inputs_hash
 
 
 def update_versioned_documentation_tag(tag: str):
-    tags = list(
-        map(
-            lambda x: x["commit"]["sha"], filter(lambda x: x["name"] == tag, get_tags())
-        )
-    )
-    if len(tags) == 0:
+    commit = source.get_tag_commit(tag)
+    if not commit:
         raise Exception("Tag not found in repostitory")
-    commit = tags[0]
     version = get_versions_from_tag(tag)
     if not version:
         raise Exception("Unable to get version from tag")
     major = get_major(version)
     majors_existing = get_newest_version_for_major(get_existing_versions(output_path))
-    if major in majors_existing and version <= majors_existing[major]:
-        return
+    if major in majors_existing and version < majors_existing[major]:
+        return False
     folder_path = output_path / version_to_folder_name(version)
-    if not folder_path.exists():
-        os.makedirs(folder_path.resolve())
-    object_path = folder_path / object_file_name
-    calc_path = folder_path / calc_file_name
     meta_path = folder_path / meta_info_name
-    updateObjects(commit, object_path)
-    updateCalcs(commit, calc_path)
-    update_meta_info(commit, version, meta_path)
+    if is_up_to_date(commit, meta_path):
+        print(f"{folder_path.name} is up to date with {commit[0:7]}")
+        return False
+    update_documentation_folder(commit, version, folder_path)
+    return True
 
 
 def update_versioned_documentation():
-    tags = get_tags()
+    tags = source.get_tags()
     tag_versions = {}
     for tag in tags:
         version = get_versions_from_tag(tag["name"])
@@ -67,32 +119,152 @@ def update_versioned_documentation():
             tag_versions[version] = tag["commit"]["sha"]
     majors_tags = get_newest_version_for_major(list(tag_versions.keys()))
     majors_existing = get_newest_version_for_major(get_existing_versions(output_path))
+    updates = []
     for major, ver in majors_tags.items():
-        if major in majors_existing and ver <= majors_existing[major]:
+        if major in majors_existing and ver < majors_existing[major]:
             continue
         commit = tag_versions[ver]
         folder_path = output_path / version_to_folder_name(ver)
-        if not folder_path.exists():
-            os.makedirs(folder_path.resolve())
-        object_path = folder_path / object_file_name
-        calc_path = folder_path / calc_file_name
         meta_path = folder_path / meta_info_name
-        updateObjects(commit, object_path)
-        updateCalcs(commit, calc_path)
-        update_meta_info(commit, ver, meta_path)
+        if is_up_to_date(commit, meta_path):
+            print(f"{folder_path.name} is up to date with {commit[0:7]}")
+            continue
+        updates.append((commit, ver, folder_path))
+    with ThreadPoolExecutor(max_workers=jobs) as version_executor:
+        futures = [
+            version_executor.submit(update_documentation_folder, *update)
+            for update in updates
+        ]
+        failures = []
+        for (_, _, folder_path), future in zip(updates, futures):
+            try:
+                future.result()
+            except Exception as e:
+                print(f"Failed to update {folder_path.name}: {e}")
+                failures.append(folder_path.name)
+    if failures:
+        raise Exception(f"Failed to update {', '.join(failures)}")
 
 
 def update_latest_documentation():
     folder_path = output_path / "latest"
-    if not folder_path.exists():
-        os.makedirs(folder_path.resolve())
+    meta_path = folder_path / meta_info_name
+    commit = source.get_commit_id("main")
+    if is_up_to_date(commit, meta_path):
+        print(f"{folder_path.name} is up to date with {commit[0:7]}")
+        return False
+    update_documentation_folder(commit, "latest", folder_path)
+    return True
+
+
+def update_documentation_folder(
+    commit: str, version: Union[tuple, str], folder_path: Path
+):
     object_path = folder_path / object_file_name
     calc_path = folder_path / calc_file_name
     meta_path = folder_path / meta_info_name
-    commit = get_commit_id("main")
-    updateObjects(commit, object_path)
-    updateCalcs(commit, calc_path)
-    update_meta_info(commit, "latest", meta_path)
+    objects = updateObjects(commit)
+    calcs = updateCalcs(commit)
+    # The hierarchy validates the containers of the objects, so the indexes
+    # are built before any file of the folder is replaced
+    with profiler.stage("indexes"):
+        hierarchy = build_hierarchy(objects)
+        calc_index = build_calc_index(calcs)
+    if not folder_path.exists():
+        os.makedirs(folder_path.resolve(), exist_ok=True)
+    with profiler.stage("write"):
+        write_yaml_list(objects, object_path.resolve())
+        write_yaml_list(calcs, calc_path)
+    with profiler.stage("bundle"):
+        write_bundle(folder_path, objects, calcs, object_path, calc_path)
+    with profiler.stage("indexes"):
+        write_hierarchy(folder_path, hierarchy)
+        write_calc_index(folder_path, calc_index)
+    with profiler.stage("snippets"):
+        generate_snippets(folder_path.name, output_path, objects)
+    # The meta info marks the folder as up to date, so it is written last
+    update_meta_info(commit, version, meta_path)
+    update_manifest(output_path, folder_path.name)
+    updated_folders.append(folder_path)
+
+
+def update_all_snippets():
+    versions = get_versions(output_path)
+    generate_all_snippets(output_path, versions)
+    for version in versions:
+        update_manifest(output_path, version)
+
+
+def update_bundles():
+    for version in get_versions(output_path):
+        folder_path = output_path / version
+        object_path = folder_path / object_file_name
+        calc_path = folder_path / calc_file_name
+        if object_path.exists() and calc_path.exists():
+            rebuild_bundle(folder_path, object_path, calc_path)
+
+
+def update_indexes():
+    for version in get_versions(output_path):
+        folder_path = output_path / version
+        object_path = folder_path / object_file_name
+        calc_path = folder_path / calc_file_name
+        if object_path.exists():
+            rebuild_hierarchy(folder_path, object_path)
+        if calc_path.exists():
+            rebuild_calc_index(folder_path, calc_path)
+
+
+def update_examples():
+    counts = generate_examples(
+        output_path / "latest" / "snippets.yaml", Path(default_output_dir)
+    )
+    print(f"Examples: {counts['written']} written, {counts['removed']} removed")
+
+
+def poll_documentation() -> List[Path]:
+    """Update the folders of new or moved tags and of main.
+
+    A failing tag does not keep main from being updated, and the version
+    options and examples follow every folder that was updated, also when the
+    poll fails.
+    """
+    start = len(updated_folders)
+    failures = []
+    try:
+        source.refresh()
+        for update in (update_versioned_documentation, update_latest_documentation):
+            try:
+                update()
+            except Exception as e:
+                failures.append(str(e))
+    finally:
+        folders = updated_folders[start:]
+        if any(folder_path.name != "latest" for folder_path in folders):
+            update_version_options()
+        if any(folder_path.name == "latest" for folder_path in folders):
+            update_examples()
+    if failures:
+        raise Exception("; ".join(failures))
+    return folders
+
+
+def watch(interval: float, polls: Optional[int] = None):
+    global force
+    poll = 0
+    while True:
+        poll += 1
+        try:
+            folders = poll_documentation()
+        except Exception as e:
+            print(f"Poll {poll} failed: {e}")
+        else:
+            names = ", ".join(folder_path.name for folder_path in folders)
+            print(f"Poll {poll}: {'updated ' + names if names else 'no changes'}")
+        force = False
+        if polls is not None and poll >= polls:
+            return
+        time.sleep(interval)
 
 
 def update_version_options():
@@ -106,50 +278,174 @@ def update_version_options():
         json.dump(package, f, indent=2)
 
 
-def updateObjects(ref: str, output_path: Path):
-    objects: List[SepticObject] = []
-    file_generator = get_object_files(ref)
-    for f in file_generator:
-        objects.extend(parse_object_documentation(f))
-    objects.sort(key=lambda x: x.name)
-    with open(output_path.resolve(), "w") as file:
-        yaml.dump(
-            [asdict(obj) for obj in objects],
-            file,
-            sort_keys=False,
-        )
+def updateObjects(ref: str) -> List[dict]:
+    objects: List[dict] = []
+    files = profiler.timed("fetch", source.get_object_files(ref))
+
+    def submit(file: str):
+        # Without a process pool the file is parsed while it is submitted
+        with profiler.stage("parse"):
+            return submit_object_documentation(file, executor)
+
+    for _, future in bounded_futures(submit, files, jobs * 2):
+        with profiler.stage("parse"):
+            objects.extend(to_value(future.result()))
+    objects.sort(key=lambda x: x["name"])
+    return objects
 
 
-def updateCalcs(ref: str, output_path: Path):
-    calc_file = get_calc_file(ref)
-    calcs = parse_calc_documentation(calc_file)
+def updateCalcs(ref: str) -> List[dict]:
+    with profiler.stage("fetch"):
+        calc_file = source.get_calc_file(ref)
+    with profiler.stage("parse"):
+        calcs = submit_calc_documentation(calc_file, executor).result()
     calcs.sort(key=lambda x: x.name)
-    calcs = filter(test_calc, calcs)
-    with open(output_path, "w") as file:
-        yaml.dump([asdict(calc) for calc in calcs], file, sort_keys=False)
+    return to_value(list(filter(test_calc, calcs)))
 
 
 def update_meta_info(commit: str, version: Union[tuple, str], output_path: Path):
     if isinstance(version, tuple):
         version = ".".join([str(x) for x in version])
-    meta = {"commit": commit[0:7], "version": version}
+    meta = {"commit": commit[0:7], "version": version, "inputs": inputs_hash}
     with open(output_path, "w") as file:
         yaml.dump(meta, file, sort_keys=False)
 
 
 if __name__ == "__main__":
-    if len(sys.argv) == 1:
+    parser = argparse.ArgumentParser(
+        description="Update the Septic documentation from the SEPTIC repository"
+    )
+    parser.add_argument(
+        "ref",
+        nargs="?",
+        help="Branch or tag to update documentation for (default: all versions and latest)",
+    )
+    parser.add_argument(
+        "--source",
+        default="contents",
+        help="Where to read SEPTIC sources from: 'contents' (GitHub contents API), 'archive' (GitHub tarball), 'git:PATH' (any ref of a local clone) or a path to a local checkout or tarball of one ref (default: contents)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Regenerate the documentation even if it is up to date with the ref",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        help="Number of processes used for parsing and of versions updated concurrently (default: 1)",
+    )
+    parser.add_argument(
+        "--rebuild-bundles",
+        action="store_true",
+        help="Only rebuild the precompiled documentation bundles from the existing YAML files",
+    )
+    parser.add_argument(
+        "--rebuild-indexes",
+        action="store_true",
+        help=f"Only rebuild the {hierarchy_file_name} and {calc_index_file_name} indexes from the existing YAML files",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help=f"Time the stages and requests of the run and write one report of the run to {profile_file_name} in the documentation folder",
+    )
+    parser.add_argument(
+        "--profile-parse",
+        type=Path,
+        metavar="PATH",
+        help="Write a cProfile dump of the parse stage to PATH (requires --jobs 1)",
+    )
+    parser.add_argument(
+        "--rebuild-snippets",
+        action="store_true",
+        help="Only regenerate the snippets of all version folders from their objectsDoc.yaml",
+    )
+    parser.add_argument(
+        "--rebuild-manifest",
+        action="store_true",
+        help=f"Only rebuild {manifest_name} from the version folders",
+    )
+    parser.add_argument(
+        "--deltas",
+        action="store_true",
+        help=f"Also store all versions as deltas against latest in {deltas_folder_name}/",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and update the folders of new tags and of main whenever they change",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=300,
+        help="Seconds between the polls of --watch (default: 300)",
+    )
+    parser.add_argument(
+        "--polls",
+        type=int,
+        help="Stop --watch after this many polls (default: run until interrupted)",
+    )
+    args = parser.parse_args()
+    if args.watch and args.ref:
+        parser.error("--watch updates all versions and cannot be used with a ref")
+    if args.profile_parse and args.jobs > 1:
+        parser.error("--profile-parse requires --jobs 1")
+    profiler.enabled = args.profile or args.profile_parse is not None
+    if args.profile_parse:
+        profiler.parse_profile = cProfile.Profile()
+    source = get_source(args.source)
+    rebuild = (
+        args.rebuild_manifest
+        or args.rebuild_bundles
+        or args.rebuild_indexes
+        or args.rebuild_snippets
+    )
+    if not (args.ref or rebuild) and isinstance(source, LocalSource):
+        if not source.has_history():
+            parser.error(
+                f"{args.source} only holds the files of one ref, give the ref to update"
+            )
+    force = args.force
+    jobs = max(args.jobs, 1)
+    if jobs > 1:
+        executor = ProcessPoolExecutor(
+            max_workers=jobs, mp_context=multiprocessing.get_context("spawn")
+        )
+    if args.rebuild_manifest:
+        rebuild_manifest(output_path)
+    elif args.rebuild_bundles:
+        update_bundles()
+    elif args.rebuild_indexes:
+        update_indexes()
+    elif args.rebuild_snippets:
+        update_all_snippets()
+    elif args.watch:
+        watch(args.interval, args.polls)
+    elif not args.ref:
         update_versioned_documentation()
         update_latest_documentation()
         update_version_options()
-    elif len(sys.argv) == 2:
-        ref = sys.argv[1].split("/")[-1]
+    else:
+        ref = args.ref.split("/")[-1]
         if ref == "main":
             update_latest_documentation()
-            generate_snippets("latest", output_path)
-        else:
-            update_versioned_documentation_tag(ref)
+        elif update_versioned_documentation_tag(ref):
             update_version_options()
-            generate_snippets(
-                version_to_folder_name(get_versions_from_tag(ref)), output_path
-            )
+    if args.deltas:
+        write_deltas(output_path, get_versions(output_path))
+    if executor:
+        executor.shutdown()
+    source.close()
+    if profiler.enabled:
+        profiler.write_report(output_path, [x.name for x in updated_folders])
+        if args.profile_parse:
+            profiler.write_parse_profile(args.profile_parse)
+        print(profiler.summary())
+    print(source_cache.report())
+    print(parse_cache.report())
+    print(response_cache.report())
+    print(prefilter_stats.report())
@@ -0,0 +1,219 @@
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from src.documentation import load_yaml_list
+
+# The bundle is three lines of minified JSON: a header with the field names,
+# the interned strings and an index from name to [offset, length] of each
+# record, followed by the object records and the calc records. Offsets are
+# byte offsets from the start of the second line.
+bundle_file_name = "documentation.jsonl"
+bundle_format_version = 1
+
+object_fields = ["name", "description", "parents", "attributes"]
+attribute_fields = [
+    "name",
+    "description",
+    "dataType",
+    "list",
+    "enums",
+    "default",
+    "postfix",
+    "snippet",
+    "calc",
+    "noCnfg",
+    "nosnippet",
+    "tags",
+]
+calc_fields = [
+    "name",
+    "signature",
+    "parameters",
+    "retr",
+    "detailedDescription",
+    "quality",
+]
+parameter_fields = ["name", "description", "direction", "datatype", "arity"]
+
+
+def dump_json(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+class StringTable:
+    """Strings interned by first occurrence"""
+
+    def __init__(self):
+        self.strings: List[str] = []
+        self.indexes: Dict[str, int] = {}
+
+    def intern(self, value: str) -> int:
+        index = self.indexes.get(value)
+        if index is None:
+            index = self.indexes[value] = len(self.strings)
+            self.strings.append(value)
+        return index
+
+    def encode(self, value: Any) -> Any:
+        if isinstance(value, str):
+            return self.intern(value)
+        if isinstance(value, list):
+            return [self.encode(v) for v in value]
+        return value
+
+
+def decode(value: Any, strings: List[str]) -> Any:
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, int):
+        return strings[value]
+    if isinstance(value, list):
+        return [decode(v, strings) for v in value]
+    return value
+
+
+def encode_record(
+    item: dict, item_fields: List[str], table: StringTable, nested: Tuple[str, list]
+) -> list:
+    nested_name, nested_fields = nested
+    return [
+        (
+            [encode_record(x, nested_fields, table, ("", [])) for x in item[name]]
+            if name == nested_name
+            else table.encode(item.get(name))
+        )
+        for name in item_fields
+    ]
+
+
+def decode_record(
+    record: list, item_fields: List[str], strings: List[str], nested: Tuple[str, list]
+) -> dict:
+    nested_name, nested_fields = nested
+    return {
+        name: (
+            [decode_record(x, nested_fields, strings, ("", [])) for x in value]
+            if name == nested_name
+            else decode(value, strings)
+        )
+        for name, value in zip(item_fields, record)
+    }
+
+
+def encode_records(
+    items: List[dict], item_fields: List[str], table: StringTable, nested: tuple
+) -> Tuple[str, Dict[str, List[int]]]:
+    parts = []
+    index = {}
+    offset = 1
+    for item in items:
+        part = dump_json(encode_record(item, item_fields, table, nested))
+        length = len(part.encode("utf-8"))
+        index.setdefault(item["name"], [offset, length])
+        offset += length + 1
+        parts.append(part)
+    return "[" + ",".join(parts) + "]", index
+
+
+def encode_bundle(objects: List[dict], calcs: List[dict]) -> str:
+    table = StringTable()
+    objects_line, objects_index = encode_records(
+        objects, object_fields, table, ("attributes", attribute_fields)
+    )
+    calcs_line, calcs_index = encode_records(
+        calcs, calc_fields, table, ("parameters", parameter_fields)
+    )
+    calcs_start = len(objects_line.encode("utf-8")) + 1
+    header = {
+        "version": bundle_format_version,
+        "fields": {
+            "object": object_fields,
+            "attribute": attribute_fields,
+            "calc": calc_fields,
+            "parameter": parameter_fields,
+        },
+        "strings": table.strings,
+        "index": {
+            "objects": objects_index,
+            "calcs": {
+                name: [calcs_start + offset, length]
+                for name, (offset, length) in calcs_index.items()
+            },
+        },
+    }
+    return "\n".join([dump_json(header), objects_line, calcs_line]) + "\n"
+
+
+def decode_bundle(content: str) -> Tuple[List[dict], List[dict]]:
+    header_line, objects_line, calcs_line = content.split("\n")[0:3]
+    header = json.loads(header_line)
+    strings = header["strings"]
+    fields = header["fields"]
+    objects = [
+        decode_record(
+            record, fields["object"], strings, ("attributes", fields["attribute"])
+        )
+        for record in json.loads(objects_line)
+    ]
+    calcs = [
+        decode_record(
+            record, fields["calc"], strings, ("parameters", fields["parameter"])
+        )
+        for record in json.loads(calcs_line)
+    ]
+    return objects, calcs
+
+
+def check_bundle(content: str, objects_path: Path, calcs_path: Path):
+    objects, calcs = decode_bundle(content)
+    expected_objects = load_yaml_list(objects_path)
+    expected_calcs = load_yaml_list(calcs_path)
+    object_nested = ("attributes", attribute_fields)
+    if normalize(objects, object_fields, object_nested) != normalize(
+        expected_objects, object_fields, object_nested
+    ):
+        raise Exception(f"Bundle objects do not match {objects_path}")
+    calc_nested = ("parameters", parameter_fields)
+    if normalize(calcs, calc_fields, calc_nested) != normalize(
+        expected_calcs, calc_fields, calc_nested
+    ):
+        raise Exception(f"Bundle calcs do not match {calcs_path}")
+
+
+def normalize(items: List[dict], item_fields: List[str], nested: tuple) -> List[dict]:
+    nested_name, nested_fields = nested
+    return [
+        {
+            name: (
+                normalize(item[name], nested_fields, ("", []))
+                if name == nested_name
+                else item.get(name)
+            )
+            for name in item_fields
+        }
+        for item in items
+    ]
+
+
+def write_bundle(
+    folder_path: Path,
+    objects: List[dict],
+    calcs: List[dict],
+    objects_path: Path,
+    calcs_path: Path,
+):
+    content = encode_bundle(objects, calcs)
+    check_bundle(content, objects_path, calcs_path)
+    with open(folder_path / bundle_file_name, "w", encoding="utf-8") as file:
+        file.write(content)
+
+
+def rebuild_bundle(folder_path: Path, objects_path: Path, calcs_path: Path):
+    write_bundle(
+        folder_path,
+        load_yaml_list(objects_path),
+        load_yaml_list(calcs_path),
+        objects_path,
+        calcs_path,
+    )
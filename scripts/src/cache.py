@@ -0,0 +1,197 @@
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import Executor, Future
+from dataclasses import astuple
+from pathlib import Path
+from typing import Callable, List, Optional
+
+import src.parse_doxygen as parse_doxygen
+from src.parse_doxygen import (
+    Attribute,
+    Calc,
+    Parameter,
+    SepticObject,
+    parse_calc_documentation,
+    parse_object_documentation,
+)
+from src.prefilter import file_has_marker
+from src.profiling import profiler
+
+cache_dir = Path(os.getenv("SEPTIC_CACHE_DIR", Path(__file__).parent.parent / ".cache"))
+max_cache_size = int(os.getenv("SEPTIC_CACHE_SIZE", str(256 * 1024 * 1024)))
+parser_version = hashlib.sha256(Path(parse_doxygen.__file__).read_bytes()).hexdigest()
+
+
+def git_blob_sha(content: bytes) -> str:
+    header = f"blob {len(content)}\0".encode()
+    return hashlib.sha1(header + content).hexdigest()
+
+
+class DiskCache:
+    """Files stored on disk by content key, evicting the least recently used"""
+
+    def __init__(self, name: str, path: Path, max_size: int):
+        self.name = name
+        self.path = path
+        self.max_size = max_size
+        self.size: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def file_path(self, key: str) -> Path:
+        return self.path / key[:2] / key
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self.file_path(key)
+        try:
+            content = path.read_bytes()
+            os.utime(path)
+        except FileNotFoundError:
+            with self.lock:
+                self.misses += 1
+            return None
+        with self.lock:
+            self.hits += 1
+        return content
+
+    def contains(self, key: str, marker: str) -> Optional[bool]:
+        path = self.file_path(key)
+        try:
+            found = file_has_marker(path, marker)
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return found
+
+    def record_hit(self):
+        with self.lock:
+            self.hits += 1
+
+    def put(self, key: str, content: bytes, replace: bool = False):
+        path = self.file_path(key)
+        replaced = 0
+        if path.exists():
+            if not replace:
+                return
+            replaced = path.stat().st_size
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{key}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(content)
+        os.replace(tmp_path, path)
+        with self.lock:
+            if self.size is None:
+                self.size = sum(f.stat().st_size for f in self.files())
+            else:
+                self.size += len(content) - replaced
+            if self.size > self.max_size:
+                self.evict()
+
+    def files(self):
+        return (f for f in self.path.glob("*/*") if not f.name.endswith(".tmp"))
+
+    def evict(self):
+        entries = []
+        for f in self.files():
+            try:
+                stat = f.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, f))
+        entries.sort()
+        self.size = sum(size for _, size, _ in entries)
+        for _, size, f in entries:
+            if self.size <= self.max_size:
+                break
+            f.unlink(missing_ok=True)
+            self.size -= size
+
+    def report(self) -> str:
+        return f"{self.name}: {self.hits} hits, {self.misses} misses"
+
+
+source_cache = DiskCache("Source cache", cache_dir / "sources", max_cache_size)
+parse_cache = DiskCache("Parse cache", cache_dir / "parsed", max_cache_size)
+response_cache = DiskCache("Response cache", cache_dir / "responses", max_cache_size)
+
+
+def parse_key(kind: str, file: str) -> str:
+    content = f"{parser_version}\0{kind}\0{file}".encode("utf-8", "surrogatepass")
+    return hashlib.sha256(content).hexdigest()
+
+
+def dump_parsed(items: list) -> bytes:
+    return json.dumps(
+        [astuple(item) for item in items], separators=(",", ":"), ensure_ascii=False
+    ).encode("utf-8")
+
+
+def as_record(cls: type, values: list):
+    return cls(*(tuple(x) if isinstance(x, list) else x for x in values))
+
+
+def load_objects(cached: bytes) -> List[SepticObject]:
+    return [
+        SepticObject(
+            name,
+            description,
+            tuple(parents),
+            tuple(as_record(Attribute, attr) for attr in attributes),
+        )
+        for name, description, parents, attributes in json.loads(cached)
+    ]
+
+
+def load_calcs(cached: bytes) -> List[Calc]:
+    return [
+        Calc(
+            name,
+            signature,
+            tuple(as_record(Parameter, param) for param in parameters),
+            retr,
+            detailed_description,
+            quality,
+        )
+        for name, signature, parameters, retr, detailed_description, quality in json.loads(
+            cached
+        )
+    ]
+
+
+def submit_parse(
+    kind: str,
+    file: str,
+    parse: Callable[[str], list],
+    load: Callable[[bytes], list],
+    executor: Optional[Executor] = None,
+) -> Future:
+    key = parse_key(kind, file)
+    cached = parse_cache.get(key)
+    if cached is not None:
+        future = Future()
+        future.set_result(load(cached))
+        return future
+    if executor:
+        future = executor.submit(parse, file)
+    else:
+        future = Future()
+        future.set_result(profiler.parse(parse, file))
+
+    def store(done: Future):
+        if not done.cancelled() and done.exception() is None:
+            parse_cache.put(key, dump_parsed(done.result()))
+
+    future.add_done_callback(store)
+    return future
+
+
+def submit_object_documentation(file: str, executor: Optional[Executor] = None):
+    return submit_parse(
+        "objects", file, parse_object_documentation, load_objects, executor
+    )
+
+
+def submit_calc_documentation(file: str, executor: Optional[Executor] = None):
+    return submit_parse("calcs", file, parse_calc_documentation, load_calcs, executor)
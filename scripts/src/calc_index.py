@@ -0,0 +1,123 @@
+import re
+from pathlib import Path
+from typing import List, Optional
+
+import yaml
+
+from src.documentation import CDumper, load_yaml_list
+
+# Arities and datatypes of the calcs of a version, normalized so that the
+# language server can check the arguments of a call with lookups instead of
+# parsing the arity strings. The parameters of a calc are a fixed head, an
+# optional variadic group that is repeated at least once, and a fixed tail.
+# Parameters of the group with a count (arity $name or name) are repeated as
+# many times as the value of that parameter.
+calc_index_file_name = "calcIndex.yaml"
+
+signature_regex = re.compile(r"\((.*)\)")
+trailing_number_regex = re.compile(r"\d+$")
+
+
+def parse_arity(arity: str, names: List[str]) -> dict:
+    """Kind of a parameter arity: fixed with a count, optional or variadic"""
+    references = {name.lower(): name for name in names}
+    if arity.isdigit():
+        return {"kind": "fixed", "count": int(arity)}
+    if arity == "?":
+        return {"kind": "optional"}
+    if arity == "+":
+        return {"kind": "variadic", "count": None}
+    if arity[0] == "=" and arity[1:].lower() in references:
+        return {"kind": "variadic", "count": None}
+    reference = arity.removeprefix("$").lower()
+    if reference in references:
+        return {"kind": "variadic", "count": references[reference]}
+    raise Exception(f"Unknown arity '{arity}'")
+
+
+def get_group_layout(signature: str, head_length: int) -> str:
+    """Whether the repeated parameters are interleaved (x1, y1, x2, y2) or in blocks (x1, x2, y1, y2)"""
+    match = signature_regex.search(signature)
+    arguments = [x.strip() for x in match.group(1).split(",")] if match else []
+    if len(arguments) < head_length + 2:
+        return "interleaved"
+    first, second = arguments[head_length : head_length + 2]
+    same_stem = trailing_number_regex.sub("", first) == trailing_number_regex.sub(
+        "", second
+    )
+    return "blocks" if same_stem else "interleaved"
+
+
+def build_calc_entry(calc: dict) -> dict:
+    parameters = calc["parameters"] or []
+    names = [param["name"] for param in parameters]
+    head: List[List[str]] = []
+    tail: List[List[str]] = []
+    group: List[dict] = []
+    optional = 0
+    count: Optional[str] = None
+    for param in parameters:
+        try:
+            arity = parse_arity(param["arity"], names)
+        except Exception as e:
+            raise Exception(f"{e} of parameter {param['name']} in {calc['name']}")
+        if (optional and arity["kind"] != "optional") or (
+            group and arity["kind"] == "optional"
+        ):
+            raise Exception(f"Optional parameters of {calc['name']} are not last")
+        datatype = list(param["datatype"])
+        if arity["kind"] == "variadic":
+            if tail:
+                raise Exception(
+                    f"Variadic parameters of {calc['name']} are not grouped"
+                )
+            group.append(param)
+            count = count or arity["count"]
+            continue
+        positions = [datatype] * (arity["count"] if arity["kind"] == "fixed" else 1)
+        optional += 1 if arity["kind"] == "optional" else 0
+        (tail if group else head).extend(positions)
+    min_arity = len(head) + len(tail) + len(group) - optional
+    return {
+        "minArity": min_arity,
+        "maxArity": None if group else len(head) + len(tail),
+        "optional": optional,
+        "head": head,
+        "variadic": (
+            {
+                "parameters": [param["name"] for param in group],
+                "datatypes": [list(param["datatype"]) for param in group],
+                "count": count,
+                "layout": (
+                    get_group_layout(calc["signature"], len(head))
+                    if len(group) > 1
+                    else "interleaved"
+                ),
+            }
+            if group
+            else None
+        ),
+        "tail": tail,
+    }
+
+
+def build_calc_index(calcs: List[dict]) -> dict:
+    """Entries of the calcs, leaving out those whose arities can not be indexed"""
+    index = {}
+    for calc in calcs:
+        if calc["name"] in index:
+            continue
+        try:
+            index[calc["name"]] = build_calc_entry(calc)
+        except Exception as e:
+            print(f"Leaving {calc['name']} out of {calc_index_file_name}: {e}")
+    return index
+
+
+def write_calc_index(folder_path: Path, calc_index: dict):
+    with open(folder_path / calc_index_file_name, "w") as file:
+        yaml.dump(calc_index, file, Dumper=CDumper, sort_keys=False)
+
+
+def rebuild_calc_index(folder_path: Path, calcs_path: Path):
+    write_calc_index(folder_path, build_calc_index(load_yaml_list(calcs_path)))
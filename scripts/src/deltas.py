@@ -0,0 +1,185 @@
+import copy
+import json
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from src.documentation import load_yaml_list
+
+# Each document of a version is stored as a delta against the same document of
+# the base version. Records are identified by their name and the number of
+# records before them with the same name, as a few names are not unique.
+deltas_folder_name = "deltas"
+base_file_name = "base.json"
+documents = {
+    "objects": ("objectsDoc.yaml", "name", ("attributes", "name")),
+    "calcs": ("calcs.yaml", "name", ("parameters", "name")),
+    "snippets": ("snippets.yaml", "prefix", None),
+}
+
+Key = Tuple[str, int]
+
+
+def get_keys(records: List[dict], key_field: str) -> List[Key]:
+    counts: Dict[str, int] = {}
+    keys = []
+    for record in records:
+        name = record[key_field]
+        keys.append((name, counts.get(name, 0)))
+        counts[name] = counts.get(name, 0) + 1
+    return keys
+
+
+def diff_record(base: dict, target: dict, nested: Optional[tuple]) -> dict:
+    changes = {}
+    nested_field = nested[0] if nested else None
+    values = {
+        field: value
+        for field, value in target.items()
+        if field != nested_field and (field not in base or base[field] != value)
+    }
+    if values:
+        changes["set"] = values
+    unset = [field for field in base if field not in target]
+    if unset:
+        changes["unset"] = unset
+    if nested_field in target and nested_field in base:
+        nested_delta = diff_records(
+            base[nested_field], target[nested_field], nested[1], None
+        )
+        if nested_delta:
+            changes["nested"] = nested_delta
+    elif nested_field in target:
+        changes.setdefault("set", {})[nested_field] = target[nested_field]
+    return changes
+
+
+def diff_records(
+    base: List[dict], target: List[dict], key_field: str, nested: Optional[tuple]
+) -> dict:
+    base_records = dict(zip(get_keys(base, key_field), base))
+    target_keys = get_keys(target, key_field)
+    target_records = dict(zip(target_keys, target))
+    delta = {}
+    removed = [key for key in base_records if key not in target_records]
+    if removed:
+        delta["removed"] = [list(key) for key in removed]
+    added = [
+        [*key, record]
+        for key, record in target_records.items()
+        if key not in base_records
+    ]
+    if added:
+        delta["added"] = added
+    changed = []
+    for key, record in target_records.items():
+        if key in base_records and base_records[key] != record:
+            changed.append([*key, diff_record(base_records[key], record, nested)])
+    if changed:
+        delta["changed"] = changed
+    if default_order(list(base_records), delta) != target_keys:
+        delta["order"] = [list(key) for key in target_keys]
+    return delta
+
+
+def default_order(base_keys: List[Key], delta: dict) -> List[Key]:
+    removed = {tuple(key) for key in delta.get("removed", [])}
+    order = [key for key in base_keys if key not in removed]
+    order.extend((name, index) for name, index, _ in delta.get("added", []))
+    return order
+
+
+def apply_record(base: dict, changes: dict, nested: Optional[tuple]) -> dict:
+    record = {
+        field: value
+        for field, value in base.items()
+        if field not in changes.get("unset", [])
+    }
+    record.update(changes.get("set", {}))
+    if "nested" in changes:
+        record[nested[0]] = apply_records(
+            base[nested[0]], changes["nested"], nested[1], None
+        )
+    return record
+
+
+def apply_records(
+    base: List[dict], delta: dict, key_field: str, nested: Optional[tuple]
+) -> List[dict]:
+    base_keys = get_keys(base, key_field)
+    records = dict(zip(base_keys, base))
+    for name, index, changes in delta.get("changed", []):
+        records[(name, index)] = apply_record(records[(name, index)], changes, nested)
+    for name, index, record in delta.get("added", []):
+        records[(name, index)] = record
+    if "order" in delta:
+        order = [tuple(key) for key in delta["order"]]
+    else:
+        order = default_order(base_keys, delta)
+    return [records[key] for key in order]
+
+
+def load_version(version_path: Path) -> Dict[str, List[dict]]:
+    return {
+        name: load_yaml_list(version_path / file_name)
+        for name, (file_name, _, _) in documents.items()
+    }
+
+
+def diff_version(
+    base: Dict[str, List[dict]], target: Dict[str, List[dict]]
+) -> Dict[str, dict]:
+    return {
+        name: diff_records(base[name], target[name], key_field, nested)
+        for name, (_, key_field, nested) in documents.items()
+    }
+
+
+def apply_version(
+    base: Dict[str, List[dict]], delta: Dict[str, dict]
+) -> Dict[str, List[dict]]:
+    return {
+        name: apply_records(base[name], delta[name], key_field, nested)
+        for name, (_, key_field, nested) in documents.items()
+    }
+
+
+def write_json(value, path: Path):
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(value, file, separators=(",", ":"), ensure_ascii=False)
+
+
+def write_deltas(output_path: Path, versions: List[str], base_version: str = "latest"):
+    deltas_path = output_path / deltas_folder_name
+    deltas_path.mkdir(exist_ok=True)
+    base = load_version(output_path / base_version)
+    write_json(
+        {"version": base_version, "documents": base}, deltas_path / base_file_name
+    )
+    for version in versions:
+        if version == base_version:
+            continue
+        target = load_version(output_path / version)
+        delta = diff_version(base, target)
+        if apply_version(base, delta) != target:
+            raise Exception(f"Delta of {version} does not reproduce its documentation")
+        write_json(delta, deltas_path / f"{version}.json")
+
+
+@lru_cache(maxsize=4)
+def load_base(deltas_path: Path) -> Tuple[str, Dict[str, List[dict]]]:
+    with open(deltas_path / base_file_name, encoding="utf-8") as file:
+        base = json.load(file)
+    return base["version"], base["documents"]
+
+
+def materialize(deltas_path: Path, version: str) -> Dict[str, List[dict]]:
+    """Objects, calcs and snippets of a version rebuilt from the base and its delta"""
+    base_version, base = load_base(deltas_path)
+    if version == base_version:
+        version_documents = base
+    else:
+        with open(deltas_path / f"{version}.json", encoding="utf-8") as file:
+            version_documents = apply_version(base, json.load(file))
+    # The records that did not change are those of the cached base
+    return copy.deepcopy(version_documents)
@@ -0,0 +1,118 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from src.documentation import get_field_names, read_calcs, read_objects, to_value
+from src.parse_doxygen import Calc, RecordPool, SepticObject
+
+object_file_name = "objectsDoc.yaml"
+calc_file_name = "calcs.yaml"
+
+
+@dataclass
+class VersionDocumentation:
+    """Objects and calcs of a version folder indexed by name"""
+
+    version: str
+    objects: Dict[str, SepticObject]
+    calcs: Dict[str, Calc]
+
+
+def index_by_name(items: List[Any]) -> Dict[str, Any]:
+    index = {}
+    counts: Dict[str, int] = {}
+    for item in items:
+        count = counts.get(item.name, 0) + 1
+        counts[item.name] = count
+        index[item.name if count == 1 else f"{item.name} ({count})"] = item
+    return index
+
+
+def read_version(
+    output_path: Path, version: str, pool: Optional[RecordPool] = None
+) -> VersionDocumentation:
+    """Documentation of a version folder, with records shared through the pool"""
+    folder_path = output_path / version
+    return VersionDocumentation(
+        version,
+        index_by_name(read_objects(folder_path / object_file_name, pool)),
+        index_by_name(read_calcs(folder_path / calc_file_name, pool)),
+    )
+
+
+def diff_fields(old: Any, new: Any, skip: Optional[str] = None) -> Dict[str, list]:
+    changes = {}
+    for name in get_field_names(type(old)):
+        if name == skip:
+            continue
+        old_value = getattr(old, name)
+        new_value = getattr(new, name)
+        if old_value is None or new_value is None:
+            continue
+        if old_value != new_value:
+            changes[name] = [to_value(old_value), to_value(new_value)]
+    return changes
+
+
+def diff_items(
+    old: Dict[str, Any], new: Dict[str, Any], nested: Optional[str] = None
+) -> dict:
+    changed = {}
+    for name, new_item in new.items():
+        old_item = old.get(name)
+        if old_item is None or old_item == new_item:
+            continue
+        changes = {}
+        fields = diff_fields(old_item, new_item, nested)
+        if fields:
+            changes["fields"] = fields
+        if nested:
+            nested_changes = diff_items(
+                index_by_name(getattr(old_item, nested)),
+                index_by_name(getattr(new_item, nested)),
+            )
+            if nested_changes:
+                changes[nested] = nested_changes
+        if changes:
+            changed[name] = changes
+    report = {
+        "added": [name for name in new if name not in old],
+        "removed": [name for name in old if name not in new],
+        "changed": changed,
+    }
+    return {key: value for key, value in report.items() if value}
+
+
+def diff_versions(old: VersionDocumentation, new: VersionDocumentation) -> dict:
+    return {
+        "from": old.version,
+        "to": new.version,
+        "objects": diff_items(old.objects, new.objects, "attributes"),
+        "calcs": diff_items(old.calcs, new.calcs, "parameters"),
+    }
+
+
+def format_changes(changes: dict, indent: str) -> List[str]:
+    lines = []
+    for name in changes.get("added", []):
+        lines.append(f"{indent}+ {name}")
+    for name in changes.get("removed", []):
+        lines.append(f"{indent}- {name}")
+    for name, change in changes.get("changed", {}).items():
+        fields = ", ".join(change.get("fields", {}))
+        lines.append(f"{indent}~ {name}" + (f": {fields}" if fields else ""))
+        for nested in ("attributes", "parameters"):
+            if nested in change:
+                lines.extend(format_changes(change[nested], indent + "    "))
+    return lines
+
+
+def format_report(report: dict) -> str:
+    lines = [f"{report['from']} -> {report['to']}"]
+    for kind in ("objects", "calcs"):
+        changes = report[kind]
+        lines.append(
+            f"  {kind}: {len(changes.get('added', []))} added, {len(changes.get('removed', []))} removed, {len(changes.get('changed', {}))} changed"
+        )
+        lines.extend(format_changes(changes, "    "))
+    return "\n".join(lines)
@@ -0,0 +1,120 @@
+import re
+from dataclasses import fields, is_dataclass
+from pathlib import Path
+from typing import Any, Iterable, List, Optional, TextIO
+
+import yaml
+
+from src.parse_doxygen import Attribute, Calc, Parameter, RecordPool, SepticObject
+
+try:
+    from yaml import CDumper as FastDumper
+    from yaml import CSafeLoader as FastLoader
+except ImportError:
+    from yaml import Dumper as FastDumper
+    from yaml import SafeLoader as FastLoader
+
+
+class Dumper(yaml.Dumper):
+    def ignore_aliases(self, data):
+        return True
+
+
+class CDumper(FastDumper):
+    def ignore_aliases(self, data):
+        return True
+
+
+# libyaml folds long double-quoted scalars differently from the pure Python
+# emitter, so items with strings that may be double-quoted use the latter.
+double_quoted_regex = re.compile(r"[^\n\x20-\x7e]| \n|\n ")
+
+field_names = {}
+
+
+def get_field_names(cls: type) -> List[str]:
+    names = field_names.get(cls)
+    if names is None:
+        names = field_names[cls] = [f.name for f in fields(cls)]
+    return names
+
+
+def to_dict(obj) -> dict:
+    return {name: to_value(getattr(obj, name)) for name in get_field_names(type(obj))}
+
+
+def to_value(value: Any) -> Any:
+    if isinstance(value, (list, tuple)):
+        return [to_value(v) for v in value]
+    if is_dataclass(value):
+        return to_dict(value)
+    return value
+
+
+def may_be_double_quoted(value: Any) -> bool:
+    if isinstance(value, str):
+        return double_quoted_regex.search(value) is not None
+    if isinstance(value, dict):
+        return any(may_be_double_quoted(v) for v in value.values())
+    if isinstance(value, list):
+        return any(may_be_double_quoted(v) for v in value)
+    return False
+
+
+def dump_item(item: Any, file: TextIO, sort_keys: bool = False):
+    dumper = Dumper if may_be_double_quoted(item) else CDumper
+    yaml.dump([item], file, Dumper=dumper, sort_keys=sort_keys)
+
+
+def write_yaml_list(items: Iterable, path: Path, sort_keys: bool = False):
+    with open(path, "w") as file:
+        empty = True
+        for item in items:
+            dump_item(to_value(item), file, sort_keys)
+            empty = False
+        if empty:
+            yaml.dump([], file)
+
+
+def load_yaml_list(path: Path) -> List[Any]:
+    with open(path) as file:
+        return yaml.load(file, Loader=FastLoader) or []
+
+
+def from_dict(cls: type, value: dict, pool: RecordPool):
+    """Record from a documentation entry, fields missing in older versions are None"""
+    return pool.create(cls, **{name: value.get(name) for name in get_field_names(cls)})
+
+
+def read_objects(path: Path, pool: Optional[RecordPool] = None) -> List[SepticObject]:
+    pool = pool or RecordPool()
+    return [
+        from_dict(
+            SepticObject,
+            {
+                **value,
+                "attributes": [
+                    from_dict(Attribute, x, pool) for x in value.get("attributes") or []
+                ],
+            },
+            pool,
+        )
+        for value in load_yaml_list(path)
+    ]
+
+
+def read_calcs(path: Path, pool: Optional[RecordPool] = None) -> List[Calc]:
+    pool = pool or RecordPool()
+    return [
+        from_dict(
+            Calc,
+            {
+                **value,
+                "parameters": [
+                    from_dict(Parameter, x, pool) for x in value.get("parameters") or []
+                ],
+            },
+            pool,
+        )
+        for value in load_yaml_list(path)
+    ]
@@ -1,24 +1,106 @@
 import base64
+import hashlib
+import json
 import os as os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Optional
 
 import requests as requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-load_dotenv()
+from src.cache import git_blob_sha, response_cache, source_cache
+from src.parse_doxygen import object_marker
+from src.pipeline import bounded_futures
+from src.prefilter import prefilter, prefilter_stats
+from src.profiling import profiler
+from src.ratelimit import scheduler
 
+load_dotenv()
 
-def send_request_github(endpoint: str):
-    base_url = "https://api.github.com"
-    url = base_url + endpoint
+base_url = os.getenv("GITHUB_API_URL", "https://api.github.com")
+max_workers = int(os.getenv("GITHUB_MAX_WORKERS", "8"))
+retry_status_codes = [500, 502, 503, 504]
+max_rate_limit_retries = 5
+page_size = 100
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def create_session(pool_size: int = max_workers) -> requests.Session:
+    retry = Retry(
+        total=5,
+        backoff_factor=1,
+        status_forcelist=retry_status_codes,
+        allowed_methods=["GET"],
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
     token = os.getenv("API_TOKEN")
-    header = {
-        "Authorization": f"Bearer {token}",
-        "Accept": "application/vnd.github+json",
-        "X-GitHub-Api-Version": "2022-11-28",
-    }
-    response = requests.get(url=url, headers=header)
+    session.headers.update(
+        {
+            "Authorization": f"Bearer {token}",
+            "Accept": "application/vnd.github+json",
+            "X-GitHub-Api-Version": "2022-11-28",
+        }
+    )
+    return session
+
+
+def get_session() -> requests.Session:
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = create_session()
+    return _session
+
+
+def request_github(
+    url: str, headers: Optional[dict] = None, stream: bool = False
+) -> requests.Response:
+    for attempt in range(max_rate_limit_retries + 1):
+        scheduler.wait()
+        start = time.perf_counter()
+        response = get_session().get(url=url, headers=headers, stream=stream)
+        if stream:
+            size = response.headers.get("Content-Length")
+            size = int(size) if size else None
+        else:
+            size = len(response.content)
+        profiler.record_request(url, response, time.perf_counter() - start, size)
+        delay = scheduler.update(response)
+        if delay is None or attempt == max_rate_limit_retries:
+            return response
+        response.close()
+        print(f"Rate limited by GitHub, retrying {url} in {delay:.0f}s")
+    return response
+
+
+def send_request_github(endpoint: str, conditional: bool = False):
+    url = base_url + endpoint
+    key = hashlib.sha256(url.encode()).hexdigest()
+    cached = response_cache.get(key) if conditional else None
+    headers = None
+    if cached is not None:
+        etag, body = cached.split(b"\n", 1)
+        headers = {"If-None-Match": etag.decode()}
+    response = request_github(url, headers)
+    if response.status_code == 304 and cached is not None:
+        return json.loads(body)
     if response.status_code != 200:
-        raise Exception(response.status_code)
+        raise Exception(f"GitHub responded with {response.status_code} to {url}")
+    etag = response.headers.get("ETag")
+    if conditional and etag:
+        response_cache.put(key, etag.encode() + b"\n" + response.content, True)
     return response.json()
 
 
@@ -31,31 +113,46 @@ def get_commit_id(branch: str):
     owner = "equinor"
     repo = "SEPTIC"
     endpoint = f"/repos/{owner}/{repo}/branches/{branch}"
-    response = send_request_github(endpoint)
+    response = send_request_github(endpoint, conditional=True)
     return response["commit"]["sha"]
 
 
 def get_calc_file(ref: str):
     path = "src/calc.cpp"
-    return get_file(ref, path)
+    entries = [x for x in get_dir(ref, "src") if x["path"] == path]
+    if not entries:
+        return get_file(ref, path)
+    return get_cached_file(ref, entries[0])
 
 
+@lru_cache
 def get_dir(ref: str, dir: str):
     owner = "equinor"
     repo = "SEPTIC"
     endpoint = f"/repos/{owner}/{repo}/contents/{dir}?ref={ref}"
-    return send_request_github(endpoint)
-
-
-def get_object_files(ref: str):
-    paths_src = get_dir(ref, "src")
-    paths = paths_src
-    paths = [x["path"] for x in paths if x["path"].endswith(".cpp")]
-    for path in paths:
-        try:
-            yield get_file(ref, path)
-        except Exception as e:
-            print(e, path)
+    return send_request_github(endpoint, conditional=True)
+
+
+def get_object_files(ref: str, workers: int = max_workers):
+    entries = get_dir(ref, "src")
+    entries = [x for x in entries if x["path"].endswith(".cpp")]
+    missing = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = bounded_futures(
+            lambda x: executor.submit(get_object_file, ref, x), entries, workers * 2
+        )
+        for entry, future in futures:
+            try:
+                content = future.result()
+            except Exception as e:
+                missing.append(f"{entry['path']}: {e}")
+                continue
+            if content is not None:
+                yield content
+    if missing:
+        raise Exception(
+            f"Failed to fetch {len(missing)} files for {ref}:\n" + "\n".join(missing)
+        )
 
 
 def get_file(ref: str, path: str):
@@ -66,11 +163,65 @@ def get_file(ref: str, path: str):
     return decode_base64(response["content"])
 
 
+def get_file_content(ref: str, path: str) -> bytes:
+    owner = "equinor"
+    repo = "SEPTIC"
+    endpoint = f"/repos/{owner}/{repo}/contents/{path}?ref={ref}"
+    response = send_request_github(endpoint)
+    with profiler.stage("decode"):
+        return base64.b64decode(response["content"])
+
+
+def get_cached_file(ref: str, entry: dict) -> str:
+    content = source_cache.get(entry["sha"])
+    if content is None:
+        content = get_file_content(ref, entry["path"])
+        if git_blob_sha(content) == entry["sha"]:
+            source_cache.put(entry["sha"], content)
+    return content.decode("utf-8")
+
+
+def get_object_file(ref: str, entry: dict) -> Optional[str]:
+    found = source_cache.contains(entry["sha"], object_marker)
+    if found is False:
+        source_cache.record_hit()
+        prefilter_stats.record(found)
+        return None
+    content = get_cached_file(ref, entry)
+    return content if prefilter(content) else None
+
+
+def get_tarball(ref: str) -> requests.Response:
+    owner = "equinor"
+    repo = "SEPTIC"
+    url = base_url + f"/repos/{owner}/{repo}/tarball/{ref}"
+    response = request_github(url, stream=True)
+    if response.status_code != 200:
+        response.close()
+        raise Exception(f"GitHub responded with {response.status_code} to {url}")
+    response.raw.decode_content = True
+    return response
+
+
+def get_pages(endpoint: str) -> list:
+    items = []
+    page = 1
+    while True:
+        separator = "&" if "?" in endpoint else "?"
+        page_items = send_request_github(
+            f"{endpoint}{separator}per_page={page_size}&page={page}", conditional=True
+        )
+        items.extend(page_items)
+        if len(page_items) < page_size:
+            return items
+        page += 1
+
+
 def get_tags():
     owner = "equinor"
     repo = "SEPTIC"
     endpoint = f"/repos/{owner}/{repo}/tags"
-    return send_request_github(endpoint)
+    return get_pages(endpoint)
 
 
 if __name__ == "__main__":
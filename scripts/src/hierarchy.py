@@ -0,0 +1,74 @@
+from collections import deque
+from pathlib import Path
+from typing import Dict, List
+
+import yaml
+
+from src.documentation import CDumper, load_yaml_list
+
+# Containment of the objects of a version, precomputed so that the language
+# server can look up what may be placed under an object, or what an object may
+# be placed under at any depth, without scanning every object. Ancestors and
+# descendants are listed nearest first.
+hierarchy_file_name = "hierarchy.yaml"
+
+
+def get_children(objects: List[dict]) -> Dict[str, List[str]]:
+    children: Dict[str, List[str]] = {obj["name"]: [] for obj in objects}
+    for obj in objects:
+        for parent in obj["parents"] or []:
+            if parent in children and obj["name"] not in children[parent]:
+                children[parent].append(obj["name"])
+    return children
+
+
+def get_closure(name: str, edges: Dict[str, List[str]]) -> List[str]:
+    closure: List[str] = []
+    seen = set()
+    queue = deque(edges.get(name, []))
+    while queue:
+        current = queue.popleft()
+        if current in seen:
+            continue
+        seen.add(current)
+        closure.append(current)
+        queue.extend(edges.get(current, []))
+    return closure
+
+
+def validate_hierarchy(objects: List[dict], parents: Dict[str, List[str]]):
+    errors = []
+    for obj in objects:
+        missing = [x for x in obj["parents"] or [] if x not in parents]
+        if missing:
+            errors.append(f"{obj['name']} has unknown containers {', '.join(missing)}")
+        if obj["name"] in get_closure(obj["name"], parents):
+            errors.append(f"{obj['name']} is contained in itself")
+    if errors:
+        raise Exception("Invalid object hierarchy:\n" + "\n".join(errors))
+
+
+def build_hierarchy(objects: List[dict]) -> dict:
+    parents = {obj["name"]: list(obj["parents"] or []) for obj in objects}
+    validate_hierarchy(objects, parents)
+    children = get_children(objects)
+    return {
+        "roots": [name for name, x in parents.items() if not x],
+        "objects": {
+            name: {
+                "children": children[name],
+                "ancestors": get_closure(name, parents),
+                "descendants": get_closure(name, children),
+            }
+            for name in parents
+        },
+    }
+
+
+def write_hierarchy(folder_path: Path, hierarchy: dict):
+    with open(folder_path / hierarchy_file_name, "w") as file:
+        yaml.dump(hierarchy, file, Dumper=CDumper, sort_keys=False)
+
+
+def rebuild_hierarchy(folder_path: Path, objects_path: Path):
+    write_hierarchy(folder_path, build_hierarchy(load_yaml_list(objects_path)))
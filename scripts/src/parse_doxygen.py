@@ -1,70 +1,230 @@
 import re
-from dataclasses import dataclass
-from typing import List, Optional
-
-doxygen_regex = r"\/\*![\s\S]*?\*\/"
-
-
-@dataclass
+import sys
+from dataclasses import astuple, dataclass
+from typing import Any, Dict, Iterator, List, Optional, Pattern, Tuple, Type, TypeVar
+
+doxygen_start = "/*!"
+doxygen_end = "*/"
+object_marker = "\\vscode"
+calc_marker = "\\calc{"
+
+command_regex = re.compile(
+    r"\\(vscode|brief|containers|param|class|calc|return|details|quality)"
+)
+blank_line_end_regex = re.compile(r"(?:\r?\n){2}|\\|\*\/")
+attribute_end_regex = re.compile(r"(?:\r?\n){2}|\\[^n]|\*\/")
+paragraph_end_regex = re.compile(r"(?:\r?\n){3}|\\|\*\/")
+
+vscode_regex = re.compile(r"\\vscode\s+([\w]+)")
+brief_regex = re.compile(r"\\brief\s")
+containers_regex = re.compile(r"\\containers\s+\[([\S\s]*)\]")
+param_regex = re.compile(r"\\param\s*")
+class_regex = re.compile(r"\\class\s+(Calc[\w]+)\b")
+calc_regex = re.compile(r"\\calc\{\s*(([\w]+)\([\S ]*\))\}")
+calc_function_regex = re.compile(r"\\calc\{[\S ]+\}")
+return_regex = re.compile(r"\\return")
+details_regex = re.compile(r"\\details")
+quality_regex = re.compile(r"\\quality")
+
+attribute_regex = re.compile(
+    r"\\param\s+([\w]+)\s+([\S\s]*?)\s+(?:\{([\S\s]+)\})(?:\s*\[([\w\s,]+)\])?"
+)
+attribute_datatype_regex = re.compile(r"([\w]+)(\[([\S\s]*)\])?")
+attribute_detail_regex = re.compile(r"^\s*([\w]+)(?::([\S\s]+))?")
+parameter_regex = re.compile(
+    r"\\param\[([\w,]+)\]\s+([\w]+)\s+([^\{]+)(?:\{([\S\s]+)\})?"
+)
+parameter_detail_regex = re.compile(r"^\s*([\w]+)(?::([\S ]+))?")
+list_regex = re.compile(r"\[([\S\s]+)\]")
+signature_params_regex = re.compile(r"\(([\)^])\)")
+
+# Full segment patterns, only used for blocks that are not terminated by */
+description_fallback_regex = re.compile(
+    r"\\brief\s([\s\S]*?)(?:(?=(?:\r?\n){2})|(?=\\|\*\/))"
+)
+attribute_fallback_regex = re.compile(
+    r"(\\param\s*[\S\s]*?)(?:(?=(?:\r?\n){2})|(?=\\[^n]|\*\/))"
+)
+parameter_fallback_regex = re.compile(
+    r"(\\param\s*[\S\s]*?)(?:(?=(?:\r?\n){2})|(?=\\|\*\/))"
+)
+return_fallback_regex = re.compile(
+    r"\\return([\s\S]*?)(?:(?=(?:\r?\n){3})|(?=\\|\*\/))"
+)
+details_fallback_regex = re.compile(
+    r"\\details([\s\S]*?)(?:(?=(?:\r?\n){3})|(?=\\|\*\/))"
+)
+quality_fallback_regex = re.compile(
+    r"\\quality([\s\S]*?)(?:(?=(?:\r?\n){2})|(?=\\|\*\/))"
+)
+
+Tokens = Dict[str, List[int]]
+R = TypeVar("R")
+
+
+@dataclass(slots=True)
 class Attribute:
     name: str
     description: str
     dataType: str
     list: bool
-    enums: List[str]
-    default: str
-    postfix: List[str]
+    enums: Tuple[str, ...]
+    default: Tuple[str, ...]
+    postfix: Tuple[str, ...]
     snippet: str
     calc: bool
     noCnfg: bool
     nosnippet: bool
-    tags: List[str]
+    tags: Tuple[str, ...]
 
 
-@dataclass
+@dataclass(slots=True)
 class SepticObject:
     name: str
     description: str
-    parents: List[str]
-    attributes: List[Attribute]
+    parents: Tuple[str, ...]
+    attributes: Tuple[Attribute, ...]
 
 
-@dataclass
+@dataclass(slots=True)
 class Parameter:
     name: str
     description: str
     direction: str
-    datatype: str
+    datatype: Tuple[str, ...]
     arity: str
 
 
-@dataclass
+@dataclass(slots=True)
 class Calc:
     name: str
     signature: str
-    parameters: Parameter
+    parameters: Tuple[Parameter, ...]
     retr: str
     detailedDescription: str
     quality: str
 
 
+def intern_value(value: Any) -> Any:
+    if isinstance(value, str):
+        return sys.intern(value)
+    if isinstance(value, (list, tuple)):
+        return tuple(intern_value(x) for x in value)
+    return value
+
+
+class RecordPool:
+    """Records with interned strings, shared with identical records of the same pool.
+
+    The records are mutable, so the pool is keyed on their values when they are
+    created. A record taken from a pool must not be changed.
+    """
+
+    def __init__(self):
+        self.records: Dict[tuple, Any] = {}
+
+    def create(self, cls: Type[R], **fields) -> R:
+        record = cls(**{name: intern_value(x) for name, x in fields.items()})
+        return self.records.setdefault((cls, astuple(record)), record)
+
+
+def iter_doxygen_blocks(file: str) -> Iterator[str]:
+    start = file.find(doxygen_start)
+    while start != -1:
+        end = file.find(doxygen_end, start + len(doxygen_start))
+        if end == -1:
+            return
+        end += len(doxygen_end)
+        yield file[start:end]
+        start = file.find(doxygen_start, end)
+
+
+def tokenize_doxygen(doxygen: str) -> Tokens:
+    tokens: Tokens = {}
+    for match in command_regex.finditer(doxygen):
+        tokens.setdefault(match.group(1), []).append(match.start())
+    return tokens
+
+
+def match_token(
+    regex: Pattern, doxygen: str, tokens: Tokens, command: str
+) -> Optional[re.Match]:
+    for pos in tokens.get(command, []):
+        match = regex.match(doxygen, pos)
+        if match:
+            return match
+    return None
+
+
+def get_segment(
+    doxygen: str,
+    pos: int,
+    head_regex: Pattern,
+    end_regex: Pattern,
+    fallback_regex: Pattern,
+) -> Optional[Tuple[int, int]]:
+    head_match = head_regex.match(doxygen, pos)
+    if not head_match:
+        return None
+    end_match = end_regex.search(doxygen, head_match.end())
+    if end_match:
+        return head_match.end(), end_match.start()
+    match = fallback_regex.match(doxygen, pos)
+    return match.span(1) if match else None
+
+
+def get_segment_text(
+    doxygen: str,
+    tokens: Tokens,
+    command: str,
+    head_regex: Pattern,
+    end_regex: Pattern,
+    fallback_regex: Pattern,
+) -> Optional[str]:
+    for pos in tokens.get(command, []):
+        span = get_segment(doxygen, pos, head_regex, end_regex, fallback_regex)
+        if span:
+            return doxygen[span[0] : span[1]]
+    return None
+
+
+def get_param_segments(
+    doxygen: str, tokens: Tokens, end_regex: Pattern, fallback_regex: Pattern
+) -> List[str]:
+    segments = []
+    last_end = 0
+    for pos in tokens.get("param", []):
+        if pos < last_end:
+            continue
+        span = get_segment(doxygen, pos, param_regex, end_regex, fallback_regex)
+        if not span:
+            continue
+        segments.append(doxygen[pos : span[1]])
+        last_end = span[1]
+    return segments
+
+
 def get_object_doxygen_from_file(file: str) -> List[str]:
-    matches_doxygen = re.findall(doxygen_regex, file)
-    return list(filter(validate_object_doxygen, matches_doxygen))
+    return list(filter(validate_object_doxygen, iter_doxygen_blocks(file)))
 
 
-def validate_object_doxygen(doxygen: str) -> bool:
-    vscode_regex = r"\\vscode\s+[\w]+"
-    if re.search(vscode_regex, doxygen):
+def validate_object_doxygen(doxygen: str, tokens: Optional[Tokens] = None) -> bool:
+    if tokens is None:
+        tokens = tokenize_doxygen(doxygen)
+    if match_token(vscode_regex, doxygen, tokens, "vscode"):
         return True
     return False
 
 
 def parse_object_documentation(file: str) -> List[SepticObject]:
-    doxygen_objects = get_object_doxygen_from_file(file)
     septic_objects: List[SepticObject] = []
-    for obj_dox in doxygen_objects:
-        obj = parse_object_doxygen_doc(obj_dox)
+    if object_marker not in file:
+        return septic_objects
+    for obj_dox in iter_doxygen_blocks(file):
+        tokens = tokenize_doxygen(obj_dox)
+        if not validate_object_doxygen(obj_dox, tokens):
+            continue
+        obj = parse_object_doxygen_doc(obj_dox, tokens)
         if obj:
             septic_objects.append(obj)
         else:
@@ -72,42 +232,51 @@ def parse_object_documentation(file: str) -> List[SepticObject]:
     return septic_objects
 
 
-def parse_object_doxygen_doc(doxygen: str) -> Optional[SepticObject]:
-    name_regex = r"\\vscode\s+([\w]+)"
-    name_match = re.search(name_regex, doxygen)
+def parse_object_doxygen_doc(
+    doxygen: str, tokens: Optional[Tokens] = None
+) -> Optional[SepticObject]:
+    if tokens is None:
+        tokens = tokenize_doxygen(doxygen)
+    name_match = match_token(vscode_regex, doxygen, tokens, "vscode")
     if not name_match:
         return None
     name = name_match.group(1)
 
-    description_regex = r"\\brief\s([\s\S]*?)(?:(?=(?:\r?\n){2})|(?=\\|\*\/))"
-    description_match = re.search(description_regex, doxygen)
-    description = description_match.group(1).strip() if description_match else ""
+    description_match = get_segment_text(
+        doxygen,
+        tokens,
+        "brief",
+        brief_regex,
+        blank_line_end_regex,
+        description_fallback_regex,
+    )
+    description = description_match.strip() if description_match else ""
 
-    parents_regex = r"\\containers\s+\[([\S\s]*)\]"
-    parents_match = re.search(parents_regex, doxygen)
+    parents_match = match_token(containers_regex, doxygen, tokens, "containers")
     parents = (
         [parent.strip() for parent in parents_match.group(1).split(",")]
         if parents_match
         else []
     )
 
-    attr_regex = r"\\param\s*[\S\s]*?(?:(?=(?:\r?\n){2})|(?=\\[^n]|\*\/))"
-    attr_matches = re.findall(attr_regex, doxygen)
+    attr_matches = get_param_segments(
+        doxygen, tokens, attribute_end_regex, attribute_fallback_regex
+    )
     attributes: List[Attribute] = []
     for attr_dox in attr_matches:
         attr = parse_attribute(attr_dox)
         if attr:
             attributes.append(attr)
     return SepticObject(
-        name=name, description=description, attributes=attributes, parents=parents
+        name=name,
+        description=description,
+        attributes=tuple(attributes),
+        parents=tuple(parents),
     )
 
 
 def parse_attribute(attribute: str) -> Optional[Attribute]:
-    attr_regex = (
-        r"\\param\s+([\w]+)\s+([\S\s]*?)\s+(?:\{([\S\s]+)\})(?:\s*\[([\w\s,]+)\])?"
-    )
-    attr_match = re.search(attr_regex, attribute)
+    attr_match = attribute_regex.search(attribute)
     if not attr_match:
         return None
     name = attr_match.group(1)
@@ -115,9 +284,9 @@ def parse_attribute(attribute: str) -> Optional[Attribute]:
     details = attr_match.group(3)
     attr_info = parse_attribute_details(details)
     tags = (
-        [e.strip() for e in attr_match.group(4).split(",")]
+        tuple([e.strip() for e in attr_match.group(4).split(",")])
         if attr_match.group(4)
-        else []
+        else ()
     )
     return Attribute(
         name=name,
@@ -139,17 +308,17 @@ def parse_attribute_details(input: str):
     information = {
         "datatype": "",
         "list": False,
-        "enums": [],
-        "postfix": [],
+        "enums": (),
+        "postfix": (),
         "calc": False,
         "nocnfg": False,
-        "default": [],
+        "default": (),
         "nosnippet": False,
         "snippet": "",
     }
 
     def datatype(inp: str):
-        datatype_match = re.search(r"([\w]+)(\[([\S\s]*)\])?", inp)
+        datatype_match = attribute_datatype_regex.search(inp)
         if not datatype_match:
             return
         information["datatype"] = datatype_match.group(1).lower()
@@ -159,15 +328,15 @@ def parse_attribute_details(input: str):
             else False
         )
         information["enums"] = (
-            [elem.strip() for elem in datatype_match.group(3).split(",")]
+            tuple([elem.strip() for elem in datatype_match.group(3).split(",")])
             if datatype_match.group(2) and datatype_match.group(1).lower() == "enum"
-            else []
+            else ()
         )
 
     def postfix(inp: str):
-        list_match = re.search(r"\[([\S\s]+)\]", inp)
+        list_match = list_regex.search(inp)
         information["postfix"] = (
-            [e.strip() for e in list_match.group(1).split(",")]
+            tuple([e.strip() for e in list_match.group(1).split(",")])
             if list_match
             else inp.strip()
         )
@@ -185,11 +354,11 @@ def parse_attribute_details(input: str):
         information["calc"] = True
 
     def default(inp: str):
-        list_match = re.search(r"\[([\S\s]+)\]", inp)
+        list_match = list_regex.search(inp)
         information["default"] = (
-            [e.strip() for e in list_match.group(1).split(",")]
+            tuple([e.strip() for e in list_match.group(1).split(",")])
             if list_match
-            else [inp.strip()]
+            else (inp.strip(),)
         )
 
     callbacks = {
@@ -201,9 +370,8 @@ def parse_attribute_details(input: str):
         "snippet": snippet,
         "default": default,
     }
-    name_regex = r"^\s*([\w]+)(?::([\S\s]+))?"
     for elem in input.split(";"):
-        name_match = re.search(name_regex, elem)
+        name_match = attribute_detail_regex.search(elem)
         if not name_match:
             continue
         name = name_match.group(1)
@@ -215,54 +383,69 @@ def parse_attribute_details(input: str):
 
 
 def get_calc_doxygen_from_file(file: str) -> List[str]:
-    matches_doxygen = re.findall(doxygen_regex, file)
-    return list(filter(validate_calc_doxygen, matches_doxygen))
+    return list(filter(validate_calc_doxygen, iter_doxygen_blocks(file)))
 
 
-def validate_calc_doxygen(doxygen: str) -> bool:
-    class_regex = r"\\class\s+(Calc[\w]+)\b"
-    function_regex = r"\\calc\{[\S ]+\}"
-    if re.search(class_regex, doxygen) and re.search(function_regex, doxygen):
+def validate_calc_doxygen(doxygen: str, tokens: Optional[Tokens] = None) -> bool:
+    if tokens is None:
+        tokens = tokenize_doxygen(doxygen)
+    if match_token(class_regex, doxygen, tokens, "class") and match_token(
+        calc_function_regex, doxygen, tokens, "calc"
+    ):
         return True
     return False
 
 
-def parse_calc_doxygen_doc(calc: str) -> Optional[Calc]:
-    parameters: List[dict] = []
-    func = re.search(r"\\calc\{\s*(([\w]+)\([\S ]*\))\}", calc)
+def parse_calc_doxygen_doc(
+    calc: str, tokens: Optional[Tokens] = None
+) -> Optional[Calc]:
+    if tokens is None:
+        tokens = tokenize_doxygen(calc)
+    parameters: List[Parameter] = []
+    func = match_token(calc_regex, calc, tokens, "calc")
     name = func.group(2) if func else None
     if not name:
         return None
     signature = func.group(1) if func else None
     if not signature:
         return None
-    param_matches = re.findall(
-        r"\\param\s*[\S\s]*?(?:(?=(?:\r?\n){2})|(?=\\|\*\/))", calc
+    param_matches = get_param_segments(
+        calc, tokens, blank_line_end_regex, parameter_fallback_regex
     )
     for param in param_matches:
         parsedParam = parse_parameter(param)
         if parsedParam:
             parameters.append(parsedParam)
-    return_match = re.search(
-        r"\\return([\s\S]*?)(?:(?=(?:\r?\n){3})|(?=\\|\*\/))", calc
+    return_match = get_segment_text(
+        calc, tokens, "return", return_regex, paragraph_end_regex, return_fallback_regex
     )
-    retr = return_match.group(1).strip() if return_match else ""
-    detailed_description_match = re.search(
-        r"\\details([\s\S]*?)(?:(?=(?:\r?\n){3})|(?=\\|\*\/))", calc
+    retr = return_match.strip() if return_match is not None else ""
+    detailed_description_match = get_segment_text(
+        calc,
+        tokens,
+        "details",
+        details_regex,
+        paragraph_end_regex,
+        details_fallback_regex,
     )
     detailed_description = (
-        detailed_description_match.group(1).strip()
-        if detailed_description_match
+        detailed_description_match.strip()
+        if detailed_description_match is not None
         else ""
     )
-    quality_match = re.search(
-        r"\\quality([\s\S]*?)(?:(?=(?:\r?\n){2})|(?=\\|\*\/))", calc
+    quality_match = get_segment_text(
+        calc,
+        tokens,
+        "quality",
+        quality_regex,
+        blank_line_end_regex,
+        quality_fallback_regex,
     )
-    quality = quality_match.group(1).strip() if quality_match else ""
+    quality = quality_match.strip() if quality_match is not None else ""
     return Calc(
         name=name,
         signature=signature,
-        parameters=parameters,
+        parameters=tuple(parameters),
         retr=retr,
         detailedDescription=detailed_description,
         quality=quality,
@@ -270,10 +453,7 @@ def parse_calc_doxygen_doc(calc: str) -> Optional[Calc]:
 
 
 def parse_parameter(param: str) -> Optional[Parameter]:
-    param_match = re.search(
-        r"\\param\[([\w,]+)\]\s+([\w]+)\s+([^\{]+)(?:\{([\S\s]+)\})?",
-        param,
-    )
+    param_match = parameter_regex.search(param)
     direction = param_match.group(1) if param_match else None
     name = param_match.group(2) if param_match else None
     if not direction or not name:
@@ -290,16 +470,16 @@ def parse_parameter(param: str) -> Optional[Parameter]:
 
 
 def parse_parameter_details(inp: Optional[str]):
-    information = {"datatype": ["value"], "arity": "1"}
+    information = {"datatype": ("value",), "arity": "1"}
     if not inp:
         return information
 
     def datatype(inp: str):
-        list_match = re.search(r"\[([\S\s]+)\]", inp)
+        list_match = list_regex.search(inp)
         information["datatype"] = (
-            [e.strip().lower() for e in list_match.group(1).split(",")]
+            tuple([e.strip().lower() for e in list_match.group(1).split(",")])
             if list_match
-            else [inp.strip().lower()]
+            else (inp.strip().lower(),)
         )
 
     def arity(inp: str):
@@ -307,9 +487,8 @@ def parse_parameter_details(inp: Optional[str]):
 
     callbacks = {"datatype": datatype, "arity": arity}
 
-    name_regex = r"^\s*([\w]+)(?::([\S ]+))?"
     for elem in inp.split(";"):
-        name_match = re.search(name_regex, elem)
+        name_match = parameter_detail_regex.search(elem)
         if not name_match:
             continue
         name = name_match.group(1)
@@ -321,10 +500,14 @@ def parse_parameter_details(inp: Optional[str]):
 
 
 def parse_calc_documentation(file: str) -> List[Calc]:
-    calcs_doxygen = get_calc_doxygen_from_file(file)
     parsedCalcs: List[Calc] = []
-    for calc_dox in calcs_doxygen:
-        parsed_calc = parse_calc_doxygen_doc(calc_dox)
+    if calc_marker not in file:
+        return parsedCalcs
+    for calc_dox in iter_doxygen_blocks(file):
+        tokens = tokenize_doxygen(calc_dox)
+        if not validate_calc_doxygen(calc_dox, tokens):
+            continue
+        parsed_calc = parse_calc_doxygen_doc(calc_dox, tokens)
         if parsed_calc:
             parsedCalcs.append(parsed_calc)
         else:
@@ -333,7 +516,7 @@ def parse_calc_documentation(file: str) -> List[Calc]:
 
 
 def test_calc(calc: Calc) -> bool:
-    params_sign_match = re.search(r"\(([\)^])\)", calc.signature)
+    params_sign_match = signature_params_regex.search(calc.signature)
     if not params_sign_match:
         return True
     param_sign = [param.strip() for param in params_sign_match.group(1).split(",")]
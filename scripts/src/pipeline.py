@@ -0,0 +1,18 @@
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, Deque, Iterable, Iterator, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+def bounded_futures(
+    submit: Callable[[T], Future], items: Iterable[T], window: int
+) -> Iterator[Tuple[T, Future]]:
+    """Items with their submitted future in order, submitting at most window items ahead"""
+    pending: Deque[Tuple[T, Future]] = deque()
+    for item in items:
+        pending.append((item, submit(item)))
+        if len(pending) >= window:
+            yield pending.popleft()
+    while pending:
+        yield pending.popleft()
@@ -0,0 +1,53 @@
+import mmap
+import threading
+from pathlib import Path
+from typing import Union
+
+from src.parse_doxygen import object_marker
+
+
+class PrefilterStats:
+    """Number of files checked and skipped before parsing"""
+
+    def __init__(self):
+        self.checked = 0
+        self.skipped = 0
+        self.lock = threading.Lock()
+
+    def record(self, found: bool):
+        with self.lock:
+            self.checked += 1
+            if not found:
+                self.skipped += 1
+
+    def report(self) -> str:
+        return f"Prefilter: skipped {self.skipped} of {self.checked} files without documentation"
+
+
+prefilter_stats = PrefilterStats()
+
+
+def has_marker(content: Union[str, bytes], marker: str) -> bool:
+    if isinstance(content, bytes):
+        return marker.encode() in content
+    return marker in content
+
+
+def file_has_marker(path: Path, marker: str) -> bool:
+    with open(path, "rb") as f:
+        if path.stat().st_size == 0:
+            return False
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return mm.find(marker.encode()) != -1
+
+
+def prefilter(content: Union[str, bytes], marker: str = object_marker) -> bool:
+    found = has_marker(content, marker)
+    prefilter_stats.record(found)
+    return found
+
+
+def prefilter_file(path: Path, marker: str = object_marker) -> bool:
+    found = file_has_marker(path, marker)
+    prefilter_stats.record(found)
+    return found
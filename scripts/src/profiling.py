@@ -0,0 +1,147 @@
+import cProfile
+import json
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+import requests
+
+profile_file_name = "profile.json"
+rate_limit_headers = {
+    "X-RateLimit-Limit": "limit",
+    "X-RateLimit-Remaining": "remaining",
+    "X-RateLimit-Used": "used",
+    "X-RateLimit-Reset": "reset",
+}
+
+
+class Profiler:
+    """Stage timers and request statistics of a run, collected when enabled"""
+
+    def __init__(self):
+        self.enabled = False
+        self.parse_profile: Optional[cProfile.Profile] = None
+        self.start = time.perf_counter()
+        self.stages: Dict[str, dict] = {}
+        self.requests: List[dict] = []
+        self.rate_limit: Dict[str, int] = {}
+        self.lock = threading.Lock()
+
+    def add_time(self, stage: str, seconds: float):
+        with self.lock:
+            entry = self.stages.setdefault(stage, {"seconds": 0.0, "count": 0})
+            entry["seconds"] += seconds
+            entry["count"] += 1
+
+    @contextmanager
+    def stage(self, name: str):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def timed(self, name: str, items: Iterable) -> Iterator:
+        if not self.enabled:
+            yield from items
+            return
+        iterator = iter(items)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.add_time(name, time.perf_counter() - start)
+                return
+            self.add_time(name, time.perf_counter() - start)
+            yield item
+
+    def parse(self, parse: Callable[[str], list], file: str) -> list:
+        if self.parse_profile is None:
+            return parse(file)
+        with self.lock:
+            return self.parse_profile.runcall(parse, file)
+
+    def record_request(
+        self,
+        url: str,
+        response: requests.Response,
+        seconds: float,
+        size: Optional[int],
+    ):
+        if not self.enabled:
+            return
+        with self.lock:
+            self.requests.append(
+                {
+                    "url": url,
+                    "status": response.status_code,
+                    "seconds": round(seconds, 6),
+                    "bytes": size,
+                }
+            )
+            for header, key in rate_limit_headers.items():
+                value = response.headers.get(header)
+                if value is not None and value.isdigit():
+                    self.rate_limit[key] = int(value)
+            remaining = self.rate_limit.get("remaining")
+            if remaining is not None:
+                lowest = self.rate_limit.get("lowest_remaining", remaining)
+                self.rate_limit["lowest_remaining"] = min(lowest, remaining)
+
+    def report(self, folders: Iterable[str] = ()) -> dict:
+        with self.lock:
+            latencies = sorted(x["seconds"] for x in self.requests)
+            statuses: Dict[str, int] = {}
+            for request in self.requests:
+                status = str(request["status"])
+                statuses[status] = statuses.get(status, 0) + 1
+            return {
+                "seconds": round(time.perf_counter() - self.start, 6),
+                "folders": list(folders),
+                "stages": {
+                    name: {"seconds": round(x["seconds"], 6), "count": x["count"]}
+                    for name, x in self.stages.items()
+                },
+                "requests": {
+                    "count": len(latencies),
+                    "bytes": sum(x["bytes"] or 0 for x in self.requests),
+                    "seconds": round(sum(latencies), 6),
+                    "median_seconds": (
+                        latencies[len(latencies) // 2] if latencies else None
+                    ),
+                    "max_seconds": latencies[-1] if latencies else None,
+                    "statuses": statuses,
+                    "rate_limit": dict(self.rate_limit),
+                    "log": list(self.requests),
+                },
+            }
+
+    def write_report(self, output_path: Path, folders: Iterable[str]):
+        with open(output_path / profile_file_name, "w") as file:
+            json.dump(self.report(folders), file, indent=2)
+
+    def write_parse_profile(self, path: Path):
+        if self.parse_profile is not None:
+            self.parse_profile.dump_stats(path)
+
+    def summary(self) -> str:
+        report = self.report()
+        lines = [f"Profile: {report['seconds']:.2f}s"]
+        for name, stage in report["stages"].items():
+            lines.append(f"  {name}: {stage['seconds']:.2f}s ({stage['count']} calls)")
+        requests_report = report["requests"]
+        lines.append(
+            f"  requests: {requests_report['count']}, {requests_report['bytes']} bytes, {requests_report['seconds']:.2f}s"
+        )
+        if requests_report["rate_limit"]:
+            lines.append(f"  rate limit: {requests_report['rate_limit']}")
+        return "\n".join(lines)
+
+
+profiler = Profiler()
@@ -0,0 +1,74 @@
+import os
+import threading
+import time
+from typing import Optional
+
+import requests
+
+rate_limit_reserve = int(os.getenv("GITHUB_RATE_LIMIT_RESERVE", "100"))
+secondary_rate_limit_delay = 60
+rate_limited_status_codes = [403, 429]
+
+
+def header_int(response: requests.Response, name: str) -> Optional[int]:
+    value = response.headers.get(name)
+    return int(value) if value is not None and value.isdigit() else None
+
+
+def is_rate_limited(response: requests.Response) -> bool:
+    if response.status_code == 429:
+        return True
+    if response.status_code != 403:
+        return False
+    if "Retry-After" in response.headers:
+        return True
+    if header_int(response, "X-RateLimit-Remaining") == 0:
+        return True
+    return "rate limit" in response.text.lower()
+
+
+class RateLimitScheduler:
+    """Paces requests from all threads by the rate limit reported by GitHub"""
+
+    def __init__(self, reserve: int = rate_limit_reserve):
+        self.reserve = reserve
+        self.next_request = 0.0
+        self.interval = 0.0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_request)
+            self.next_request = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+    def retry_delay(self, response: requests.Response) -> Optional[float]:
+        if not is_rate_limited(response):
+            return None
+        retry_after = header_int(response, "Retry-After")
+        if retry_after is not None:
+            return retry_after
+        reset = header_int(response, "X-RateLimit-Reset")
+        if header_int(response, "X-RateLimit-Remaining") == 0 and reset is not None:
+            return max(reset - time.time(), 0) + 1
+        return secondary_rate_limit_delay
+
+    def update(self, response: requests.Response) -> Optional[float]:
+        """Adjusts the pace to the response, returns the delay before retrying it if it was rate limited"""
+        delay = self.retry_delay(response)
+        remaining = header_int(response, "X-RateLimit-Remaining")
+        reset = header_int(response, "X-RateLimit-Reset")
+        with self.lock:
+            if remaining is not None and reset is not None:
+                if remaining <= self.reserve:
+                    self.interval = max(reset - time.time(), 0) / max(remaining, 1)
+                else:
+                    self.interval = 0.0
+            if delay is not None:
+                self.next_request = max(self.next_request, time.monotonic() + delay)
+        return delay
+
+
+scheduler = RateLimitScheduler()
@@ -1,8 +1,9 @@
-from dataclasses import asdict, dataclass
+import json
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List
+from typing import Callable, Dict, List, Optional
 
-import yaml
+from src.documentation import load_yaml_list, write_yaml_list
 
 indents_attribute_value = 17
 spaces_between_int_values = 6
@@ -17,12 +18,16 @@ class Snippet:
     description: str
 
 
+def is_true(value) -> bool:
+    return value is True or value == "true"
+
+
 def create_snippet(obj: dict) -> Snippet:
     prefix = obj["name"].lower()
     body = []
     body.append(format_header(obj["name"]))
     for attr in obj["attributes"]:
-        if attr["noCnfg"] == "true" or attr["nosnippet"] == "true":
+        if is_true(attr["noCnfg"]) or is_true(attr.get("nosnippet")):
             continue
         body.extend(format_attribute(attr))
     description = obj["description"]
@@ -51,7 +56,7 @@ def format_attribute(attribute: dict):
     indents_attribute_delimiter = 14
     indents_line = max(indents_attribute_delimiter - len(name), 0)
     attribute_def = " " * indents_line + name + "=  "
-    if attribute["snippet"]:
+    if attribute.get("snippet"):
         attribute_values = [attribute["snippet"]]
     else:
         attribute_values = format_attribute_value(
@@ -61,17 +66,12 @@ def format_attribute(attribute: dict):
     return attribute_values
 
 
-def format_attribute_value(values: List[str], is_list: str, datatype: str) -> List[str]:
+def format_attribute_value(values: List[str], is_list, datatype: str) -> List[str]:
     if not values:
         return [""]
-    if is_list == "true" and datatype.lower() in ["string", "variable"]:
-        return format_string_list(values)
-    elif is_list == "true" and datatype.lower() == "int":
-        return format_int_list(values)
-    elif is_list == "true":
-        sep = " " * spaces_between_values
-        return [f"{len(values)}" + sep + sep.join(values)]
-    return [values[0]]
+    if not is_true(is_list):
+        return [values[0]]
+    return list_formatters.get(datatype.lower(), format_value_list)(values)
 
 
 def format_string_list(values: List[str]):
@@ -96,12 +96,52 @@ def format_int_list(values: List[str]):
     return [line]
 
 
-def generate_snippets(version: str, output_path: Path):
+def format_value_list(values: List[str]):
+    sep = " " * spaces_between_values
+    return [f"{len(values)}" + sep + sep.join(values)]
+
+
+list_formatters: Dict[str, Callable[[List[str]], list]] = {
+    "string": format_string_list,
+    "variable": format_string_list,
+    "int": format_int_list,
+}
+
+
+def get_snippet(obj: dict, cache: Dict[str, Snippet]) -> Snippet:
+    key = json.dumps(obj, sort_keys=True)
+    snippet = cache.get(key)
+    if snippet is None:
+        snippet = cache[key] = create_snippet(obj)
+    return snippet
+
+
+def has_snippet_fields(objects: List[dict]) -> bool:
+    """Whether the objects were documented with snippets, older versions were not"""
+    return any("snippet" in attr for obj in objects for attr in obj["attributes"])
+
+
+def generate_snippets(
+    version: str,
+    output_path: Path,
+    objects: Optional[List[dict]] = None,
+    cache: Optional[Dict[str, Snippet]] = None,
+):
     version_path = output_path / version
-    with open(version_path / "objectsDoc.yaml") as file:
-        objects = yaml.load(file, Loader=yaml.BaseLoader)
-    snippets = []
-    for obj in objects:
-        snippets.append(create_snippet(obj))
-    with open(version_path / "snippets.yaml", "w") as file:
-        yaml.dump([asdict(snippet) for snippet in snippets], file)
+    if objects is None:
+        objects = load_yaml_list(version_path / "objectsDoc.yaml")
+    if not has_snippet_fields(objects):
+        print(f"{version} has no snippet fields, keeping its snippets.yaml")
+        return
+    if cache is None:
+        snippets = [create_snippet(obj) for obj in objects]
+    else:
+        snippets = [get_snippet(obj, cache) for obj in objects]
+    write_yaml_list(snippets, version_path / "snippets.yaml", sort_keys=True)
+
+
+def generate_all_snippets(output_path: Path, versions: List[str]):
+    # Snippets of objects that are identical between versions are only created once
+    cache: Dict[str, Snippet] = {}
+    for version in versions:
+        generate_snippets(version, output_path, cache=cache)
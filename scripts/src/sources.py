@@ -0,0 +1,324 @@
+import subprocess
+import tarfile
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path, PurePosixPath
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from src.github import (
+    get_calc_file,
+    get_commit_id,
+    get_object_files,
+    get_tags,
+    get_tarball,
+)
+from src.prefilter import prefilter, prefilter_file
+
+source_dir = "src"
+calc_file_path = "src/calc.cpp"
+unknown_commit = "local"
+
+
+def is_source_path(path: str) -> bool:
+    parts = PurePosixPath(path.removeprefix("./")).parts
+    return (
+        len(parts) in (2, 3) and parts[-2] == source_dir and parts[-1].endswith(".cpp")
+    )
+
+
+def source_path(path: str) -> str:
+    parts = PurePosixPath(path).parts
+    return "/".join(parts[-2:])
+
+
+def iter_tarball(tar: tarfile.TarFile) -> Iterator[Tuple[str, bytes]]:
+    for member in tar:
+        if not member.isfile() or not is_source_path(member.name):
+            continue
+        yield source_path(member.name), tar.extractfile(member).read()
+
+
+def read_tarball(tar: tarfile.TarFile) -> Dict[str, bytes]:
+    return dict(sorted(iter_tarball(tar)))
+
+
+def filter_object_files(files: Dict[str, bytes]) -> Iterator[str]:
+    for content in files.values():
+        if prefilter(content):
+            yield content.decode("utf-8")
+
+
+class Source(ABC):
+    """Provider of the tags, commits and source files of the SEPTIC repository"""
+
+    @abstractmethod
+    def get_tags(self) -> List[dict]: ...
+
+    @abstractmethod
+    def get_commit_id(self, branch: str) -> str: ...
+
+    @abstractmethod
+    def get_tag_commit(self, tag: str) -> Optional[str]: ...
+
+    @abstractmethod
+    def get_object_files(self, ref: str) -> Iterator[str]: ...
+
+    @abstractmethod
+    def get_calc_file(self, ref: str) -> str: ...
+
+    def refresh(self):
+        """Forget the tags and commits looked up so far"""
+
+    def close(self):
+        """Release the processes or files held by the source"""
+
+
+class ContentsSource(Source):
+    """Files fetched one by one through the GitHub contents API"""
+
+    def __init__(self):
+        self.tags: Optional[List[dict]] = None
+        self.tag_commits: Dict[str, str] = {}
+        self.branch_commits: Dict[str, str] = {}
+        self.lock = threading.Lock()
+
+    def get_tags(self) -> List[dict]:
+        with self.lock:
+            if self.tags is None:
+                self.tags = get_tags()
+                self.tag_commits = {x["name"]: x["commit"]["sha"] for x in self.tags}
+            return self.tags
+
+    def get_commit_id(self, branch: str) -> str:
+        with self.lock:
+            if branch not in self.branch_commits:
+                self.branch_commits[branch] = get_commit_id(branch)
+            return self.branch_commits[branch]
+
+    def get_tag_commit(self, tag: str) -> Optional[str]:
+        self.get_tags()
+        return self.tag_commits.get(tag)
+
+    def refresh(self):
+        with self.lock:
+            self.tags = None
+            self.tag_commits = {}
+            self.branch_commits = {}
+
+    def get_object_files(self, ref: str) -> Iterator[str]:
+        return get_object_files(ref)
+
+    def get_calc_file(self, ref: str) -> str:
+        return get_calc_file(ref)
+
+
+class ArchiveSource(ContentsSource):
+    """Files extracted from a single streamed tarball of the ref"""
+
+    def __init__(self):
+        super().__init__()
+        self.calc_files: Dict[str, bytes] = {}
+
+    def read_archive(self, ref: str) -> Iterator[Tuple[str, bytes]]:
+        with get_tarball(ref) as response:
+            with tarfile.open(fileobj=response.raw, mode="r|gz") as tar:
+                yield from iter_tarball(tar)
+
+    def get_object_files(self, ref: str) -> Iterator[str]:
+        for path, content in self.read_archive(ref):
+            if path == calc_file_path:
+                self.calc_files[ref] = content
+            if prefilter(content):
+                yield content.decode("utf-8")
+
+    def get_calc_file(self, ref: str) -> str:
+        content = self.calc_files.pop(ref, None)
+        if content is None:
+            files = (x for path, x in self.read_archive(ref) if path == calc_file_path)
+            content = next(files, None)
+        if content is None:
+            raise Exception(f"{calc_file_path} not found in {ref}")
+        return content.decode("utf-8")
+
+
+class LocalSource(Source):
+    """Files read from a local checkout or tarball of a single ref"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.commit: Optional[str] = None
+        self.files: Optional[Dict[str, bytes]] = None
+
+    def get_files(self) -> Dict[str, bytes]:
+        if self.files is None:
+            with tarfile.open(self.path, mode="r:*") as tar:
+                self.files = read_tarball(tar)
+                self.commit = tar.pax_headers.get("comment")
+        return self.files
+
+    def has_history(self) -> bool:
+        """Whether the tags and branches of the checkout are known, a tarball only holds one ref"""
+        return (self.path / ".git").exists()
+
+    def git(self, *args: str) -> Optional[str]:
+        if not self.has_history():
+            return None
+        result = subprocess.run(
+            ["git", "-C", str(self.path), *args], capture_output=True, text=True
+        )
+        return result.stdout.strip() if result.returncode == 0 else None
+
+    def get_tags(self) -> List[dict]:
+        commit = self.get_head()
+        tags = self.git("tag", "--points-at", "HEAD") if self.path.is_dir() else None
+        return [
+            {"name": tag, "commit": {"sha": commit}}
+            for tag in (tags.split("\n") if tags else [])
+        ]
+
+    def get_head(self) -> str:
+        if self.path.is_dir():
+            self.commit = self.git("rev-parse", "HEAD")
+        else:
+            self.get_files()
+        return self.commit or unknown_commit
+
+    def get_commit_id(self, branch: str) -> str:
+        commit = self.get_head()
+        if not self.has_history():
+            return commit
+        tips = [
+            self.git("rev-parse", "--verify", f"{name}^{{commit}}")
+            for name in (f"origin/{branch}", branch)
+        ]
+        if not any(tips):
+            raise Exception(f"Branch {branch} not found in {self.path}")
+        if commit not in tips:
+            raise Exception(f"{self.path} is not checked out at {branch}")
+        return commit
+
+    def get_tag_commit(self, tag: str) -> Optional[str]:
+        # Without history the checkout or tarball is taken to be of the given tag
+        if not self.has_history():
+            return self.get_head()
+        tags = {x["name"]: x["commit"]["sha"] for x in self.get_tags()}
+        return tags.get(tag)
+
+    def refresh(self):
+        self.commit = None
+        self.files = None
+
+    def get_object_files(self, ref: str) -> Iterator[str]:
+        if not self.path.is_dir():
+            yield from filter_object_files(self.get_files())
+            return
+        for path in sorted((self.path / source_dir).glob("*.cpp")):
+            if prefilter_file(path):
+                yield path.read_bytes().decode("utf-8")
+
+    def get_calc_file(self, ref: str) -> str:
+        if self.path.is_dir():
+            return (self.path / calc_file_path).read_bytes().decode("utf-8")
+        return self.get_files()[calc_file_path].decode("utf-8")
+
+
+class LocalGitSource(Source):
+    """Files read from any ref of a local clone through one git cat-file process"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.batch: Optional[subprocess.Popen] = None
+        self.tag_commits: Optional[Dict[str, str]] = None
+        self.lock = threading.Lock()
+
+    def git(self, *args: str) -> str:
+        result = subprocess.run(
+            ["git", "-C", str(self.path), *args], capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            raise Exception(f"git {' '.join(args)} failed: {result.stderr.strip()}")
+        return result.stdout
+
+    def read_object(self, name: str) -> Optional[bytes]:
+        with self.lock:
+            if self.batch is None:
+                self.batch = subprocess.Popen(
+                    ["git", "-C", str(self.path), "cat-file", "--batch"],
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                )
+            self.batch.stdin.write(name.encode("utf-8") + b"\n")
+            self.batch.stdin.flush()
+            header = self.batch.stdout.readline().split()
+            if len(header) != 3:
+                return None
+            content = self.batch.stdout.read(int(header[2]))
+            self.batch.stdout.read(1)
+            return content
+
+    def close(self):
+        with self.lock:
+            if self.batch is not None:
+                self.batch.stdin.close()
+                self.batch.wait()
+                self.batch = None
+
+    def get_tags(self) -> List[dict]:
+        tags = self.git(
+            "for-each-ref",
+            "--format=%(refname:short) %(objectname) %(*objectname)",
+            "refs/tags",
+        )
+        result = []
+        for line in tags.splitlines():
+            name, sha, *peeled = line.split()
+            result.append(
+                {"name": name, "commit": {"sha": peeled[0] if peeled else sha}}
+            )
+        return result
+
+    def get_commit_id(self, branch: str) -> str:
+        # A fetch only moves the remote branch, so it is preferred to the local one
+        for name in (f"origin/{branch}", branch):
+            try:
+                return self.git("rev-parse", "--verify", f"{name}^{{commit}}").strip()
+            except Exception:
+                continue
+        raise Exception(f"Branch {branch} not found in {self.path}")
+
+    def get_tag_commit(self, tag: str) -> Optional[str]:
+        if self.tag_commits is None:
+            self.tag_commits = {x["name"]: x["commit"]["sha"] for x in self.get_tags()}
+        return self.tag_commits.get(tag)
+
+    def refresh(self):
+        self.tag_commits = None
+
+    def get_object_files(self, ref: str) -> Iterator[str]:
+        entries = self.git("ls-tree", "-z", ref, f"{source_dir}/")
+        for entry in entries.split("\0"):
+            if not entry:
+                continue
+            info, path = entry.split("\t", 1)
+            _, kind, sha = info.split()
+            if kind != "blob" or not is_source_path(path):
+                continue
+            content = self.read_object(sha)
+            if content is not None and prefilter(content):
+                yield content.decode("utf-8")
+
+    def get_calc_file(self, ref: str) -> str:
+        content = self.read_object(f"{ref}:{calc_file_path}")
+        if content is None:
+            raise Exception(f"{calc_file_path} not found in {ref}")
+        return content.decode("utf-8")
+
+
+def get_source(name: str) -> Source:
+    if name == "contents":
+        return ContentsSource()
+    if name == "archive":
+        return ArchiveSource()
+    if name.startswith("git:"):
+        return LocalGitSource(Path(name.removeprefix("git:")))
+    return LocalSource(Path(name))
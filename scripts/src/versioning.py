@@ -1,11 +1,22 @@
+import hashlib
+import json
+import math
 import os
 import re
+import threading
 from pathlib import Path
-from typing import List
+from typing import Dict, List
 
 import yaml
 
 meta_info_name = "meta.yaml"
+manifest_name = "versions.json"
+manifest_file_names = ["objectsDoc.yaml", "calcs.yaml", "snippets.yaml"]
+version_folder_regex = re.compile(r"v(\d+)_(\d+)")
+folder_regex = re.compile(r"v(\d+)_(\d+)|latest")
+
+manifests: Dict[Path, Dict[str, dict]] = {}
+manifest_lock = threading.RLock()
 
 
 def folder_name_to_option(name: str):
@@ -39,17 +50,11 @@ def get_newest_version_for_major(versions: List[tuple]):
 
 
 def get_existing_versions(path: Path):
-    dirs = [x[0] for x in os.walk(path.resolve())]
     versions = []
-    for dir in dirs:
-        dir_match = re.match(r"v(\d+)_(\d+)", dir.split("\\")[-1])
-        if not dir_match:
+    for entry in read_manifest(path).values():
+        if not version_folder_regex.fullmatch(entry["folder"]):
             continue
-        try:
-            meta = read_meta_file(path / dir / meta_info_name)
-            versions.append(tuple(int(x) for x in meta["version"].split(".")))
-        except Exception as e:
-            print(f"Error reading meta file for {dir}: {e}")
+        versions.append(tuple(int(x) for x in entry["version"].split(".")))
     return versions
 
 
@@ -64,9 +69,77 @@ def get_versions_from_tag(tag: str):
     )
 
 
+def folder_sort_key(name: str):
+    match = version_folder_regex.fullmatch(name)
+    if not match:
+        return (math.inf,)
+    return (int(match.group(1)), int(match.group(2)))
+
+
 def get_versions(path: Path):
-    return [
-        Path(x[0]).name
-        for x in os.walk(path.resolve())
-        if re.match(r"(?:v(\d+)_(\d+))|latest", Path(x[0]).name)
-    ]
+    return list(read_manifest(path))
+
+
+def hash_file(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def get_manifest_entry(folder_path: Path) -> dict:
+    meta = read_meta_file(folder_path / meta_info_name) or {}
+    return {
+        "folder": folder_path.name,
+        "version": str(meta.get("version", folder_path.name)),
+        "hashes": {
+            name: hash_file(folder_path / name)
+            for name in manifest_file_names
+            if (folder_path / name).exists()
+        },
+    }
+
+
+def scan_versions(path: Path) -> Dict[str, dict]:
+    manifest = {}
+    for entry in sorted(os.scandir(path), key=lambda x: folder_sort_key(x.name)):
+        folder_path = path / entry.name
+        if not entry.is_dir() or not folder_regex.fullmatch(entry.name):
+            continue
+        if not (folder_path / meta_info_name).exists():
+            continue
+        manifest[entry.name] = get_manifest_entry(folder_path)
+    return manifest
+
+
+def read_manifest(path: Path) -> Dict[str, dict]:
+    key = path.resolve()
+    with manifest_lock:
+        if key not in manifests:
+            manifest_path = path / manifest_name
+            if manifest_path.exists():
+                with open(manifest_path) as file:
+                    entries = json.load(file)["versions"]
+                manifests[key] = {x["folder"]: x for x in entries}
+            elif path.exists():
+                manifests[key] = scan_versions(path)
+            else:
+                manifests[key] = {}
+        return manifests[key]
+
+
+def write_manifest(path: Path, manifest: Dict[str, dict]):
+    with manifest_lock:
+        manifests[path.resolve()] = manifest
+        versions = sorted(manifest.values(), key=lambda x: folder_sort_key(x["folder"]))
+        with open(path / manifest_name, "w") as file:
+            json.dump({"versions": versions}, file, indent=2)
+            file.write("\n")
+
+
+def update_manifest(path: Path, folder_name: str):
+    with manifest_lock:
+        manifest = dict(read_manifest(path))
+        manifest[folder_name] = get_manifest_entry(path / folder_name)
+        write_manifest(path, manifest)
+
+
+def rebuild_manifest(path: Path):
+    write_manifest(path, scan_versions(path))
@@ -0,0 +1,260 @@
+import base64
+import hashlib
+import json
+import re
+import subprocess
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+import src.github as github
+from src.cache import parse_cache, response_cache, source_cache
+from src.ratelimit import RateLimitScheduler
+
+filler = "\n".join(f"int f{i}(int x) {{ return x * {i}; }}" for i in range(20))
+
+system_file = f"""{filler}
+/*!
+  \\vscode System
+
+  \\brief Root of a configuration
+
+  \\param Text1 Description of the system {{datatype: String; default: ""}}
+*/
+"""
+
+evr_file = f"""{filler}
+/*!
+  \\vscode Evr
+
+  \\brief Entered value
+
+  \\param Text1 First description {{datatype: String; default: ""}}
+  \\param Meas Entered value {{datatype: Float; default: 0.0}}
+
+  \\containers [System]
+*/
+"""
+
+calc_file = """/*!
+  \\class CalcAbs
+  \\calc{abs(x)}
+
+  \\param[in] x Value {datatype: [value]; arity: 1}
+
+  \\return Absolute value of input
+
+  \\details Computes the absolute value
+
+  \\quality quality(x)
+*/
+"""
+
+plain_file = f"{filler}\n"
+
+septic_files = {
+    "src/system.cpp": system_file,
+    "src/evr.cpp": evr_file,
+    "src/plain.cpp": plain_file,
+    "src/calc.cpp": calc_file,
+    "README.md": "SEPTIC\n",
+}
+
+
+class GitRepo:
+    """A SEPTIC repository built in a temporary folder"""
+
+    def __init__(self, path: Path, origin: Optional["GitRepo"] = None):
+        self.path = path
+        path.mkdir(parents=True, exist_ok=True)
+        if origin:
+            self.git("clone", "-q", str(origin.path), ".")
+        else:
+            self.git("init", "-q", "-b", "main")
+        self.git("config", "user.email", "septic@example.com")
+        self.git("config", "user.name", "SEPTIC")
+
+    def git(self, *args: str) -> str:
+        result = subprocess.run(
+            ["git", "-C", str(self.path), *args],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        return result.stdout
+
+    def commit(
+        self,
+        files: Dict[str, Optional[str]],
+        message: str,
+        tag: Optional[str] = None,
+    ) -> str:
+        """Writes the files, or removes those without content, and commits them"""
+        for name, content in files.items():
+            path = self.path / name
+            if content is None:
+                path.unlink()
+                continue
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content)
+        self.git("add", "-A")
+        self.git("commit", "-q", "-m", message)
+        if tag:
+            self.git("tag", tag)
+        return self.git("rev-parse", "HEAD").strip()
+
+
+class GitHubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "GitHubStandIn"
+
+    def log_message(self, *args):
+        pass
+
+    def send(self, status: int, body, headers: Optional[dict] = None):
+        if not isinstance(body, bytes):
+            body = json.dumps(body).encode("utf-8")
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        if status == 200 and self.headers.get("If-None-Match") == etag:
+            status, body = 304, b""
+        self.server.requests.append((self.path, status))
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.server.rate_limited > 0:
+            self.server.rate_limited -= 1
+            message = "You have exceeded a secondary rate limit"
+            return self.send(403, {"message": message}, {"Retry-After": "0"})
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        match = re.fullmatch(r"/repos/equinor/SEPTIC/(\w+)/?(.*)", url.path)
+        if not match:
+            return self.send(404, {"message": "Not Found"})
+        kind, rest = match.groups()
+        try:
+            if kind == "tags":
+                return self.send(200, self.get_tags(query))
+            if kind == "branches":
+                return self.send(200, {"commit": {"sha": self.rev_parse(rest)}})
+            if kind == "contents":
+                return self.send(200, self.get_contents(rest, query["ref"][0]))
+            if kind == "tarball":
+                return self.send(200, self.get_tarball(rest))
+        except subprocess.CalledProcessError:
+            pass
+        self.send(404, {"message": "Not Found"})
+
+    def git(self, *args: str) -> bytes:
+        return subprocess.run(
+            ["git", "-C", str(self.server.repo.path), *args],
+            check=True,
+            capture_output=True,
+        ).stdout
+
+    def rev_parse(self, ref: str) -> str:
+        return self.git("rev-parse", "--verify", ref).decode("utf-8").strip()
+
+    def get_tags(self, query: dict) -> List[dict]:
+        per_page = int(query["per_page"][0])
+        page = int(query["page"][0])
+        lines = self.git("for-each-ref", "--format=%(refname:short)", "refs/tags")
+        names = lines.decode("utf-8").split()
+        return [
+            {"name": name, "commit": {"sha": self.rev_parse(f"{name}^{{commit}}")}}
+            for name in names[(page - 1) * per_page : page * per_page]
+        ]
+
+    def get_contents(self, path: str, ref: str):
+        if self.git("cat-file", "-t", f"{ref}:{path}").strip() == b"tree":
+            entries = []
+            for line in self.git("ls-tree", ref, f"{path}/").decode().splitlines():
+                info, name = line.split("\t")
+                _, kind, sha = info.split()
+                entries.append(
+                    {
+                        "path": name,
+                        "sha": sha,
+                        "type": "file" if kind == "blob" else kind,
+                    }
+                )
+            return entries
+        content = self.git("show", f"{ref}:{path}")
+        return {
+            "path": path,
+            "sha": self.rev_parse(f"{ref}:{path}"),
+            "content": base64.b64encode(content).decode("utf-8"),
+        }
+
+    def get_tarball(self, ref: str) -> bytes:
+        prefix = f"equinor-SEPTIC-{self.rev_parse(ref)[0:7]}/"
+        return self.git("archive", "--format=tar.gz", f"--prefix={prefix}", ref)
+
+
+class GitHubStandIn(ThreadingHTTPServer):
+    """The endpoints of the GitHub REST API used by the scripts, served from a GitRepo.
+
+    Responses carry an ETag and are answered with 304 Not Modified to a matching
+    If-None-Match header. The next rate_limited requests are answered as exceeding
+    the secondary rate limit.
+    """
+
+    def __init__(self, repo: GitRepo):
+        super().__init__(("127.0.0.1", 0), GitHubHandler)
+        self.repo = repo
+        self.rate_limited = 0
+        self.requests: List[tuple] = []
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def statuses(self, path: str) -> List[int]:
+        return [status for url, status in self.requests if url.startswith(path)]
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Keeps the disk caches of a test in its temporary folder"""
+    path = tmp_path / "cache"
+    for cache, name in (
+        (source_cache, "sources"),
+        (parse_cache, "parsed"),
+        (response_cache, "responses"),
+    ):
+        monkeypatch.setattr(cache, "path", path / name)
+        monkeypatch.setattr(cache, "size", None)
+    return path
+
+
+@pytest.fixture
+def septic_repo(tmp_path: Path) -> GitRepo:
+    """SEPTIC repository with the tag v3.7.0 and a later commit on main"""
+    repo = GitRepo(tmp_path / "SEPTIC")
+    repo.commit(septic_files, "Release 3.7", tag="v3.7.0")
+    repo.commit({"src/evr.cpp": evr_file.replace("First", "The first")}, "Reword")
+    return repo
+
+
+@pytest.fixture
+def github_api(septic_repo: GitRepo, monkeypatch: pytest.MonkeyPatch):
+    server = GitHubStandIn(septic_repo)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(github, "base_url", server.url)
+    monkeypatch.setattr(github, "_session", None)
+    monkeypatch.setattr(github, "scheduler", RateLimitScheduler())
+    github.get_dir.cache_clear()
+    yield server
+    github.get_dir.cache_clear()
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,179 @@
+import pytest
+
+from src.calc_index import (
+    build_calc_entry,
+    build_calc_index,
+    get_group_layout,
+    parse_arity,
+)
+
+
+def calc(signature: str, *parameters: tuple) -> dict:
+    return {
+        "name": signature.split("(")[0],
+        "signature": signature,
+        "parameters": [
+            {"name": name, "arity": arity, "datatype": [datatype]}
+            for name, arity, datatype in parameters
+        ],
+    }
+
+
+@pytest.mark.parametrize(
+    "arity, names, expected",
+    [
+        ("1", ["x"], {"kind": "fixed", "count": 1}),
+        ("3", ["x"], {"kind": "fixed", "count": 3}),
+        ("?", ["x"], {"kind": "optional"}),
+        ("+", ["Xn"], {"kind": "variadic", "count": None}),
+        ("=Xn", ["Xn", "Yn"], {"kind": "variadic", "count": None}),
+        ("=condN", ["condn", "exprn"], {"kind": "variadic", "count": None}),
+        ("$n", ["n", "vN"], {"kind": "variadic", "count": "n"}),
+        ("$NS", ["ns", "x"], {"kind": "variadic", "count": "ns"}),
+        ("n", ["n", "vN"], {"kind": "variadic", "count": "n"}),
+    ],
+)
+def test_parse_arity(arity: str, names: list, expected: dict):
+    assert parse_arity(arity, names) == expected
+
+
+@pytest.mark.parametrize("arity", ["*", "=Zn", "$m"])
+def test_parse_arity_rejects_unknown_arities(arity: str):
+    with pytest.raises(Exception, match=f"Unknown arity '\\{arity}'"):
+        parse_arity(arity, ["n", "Xn"])
+
+
+@pytest.mark.parametrize(
+    "signature, head_length, expected",
+    [
+        ("avgselection(n, v1, v2, ..., vN, use1, use2, ..., useN)", 1, "blocks"),
+        ("intpoltype1(x, X1, Y1, X2, Y2, ..., XN, YN)", 1, "interleaved"),
+        (
+            "ifelif(cond1, expr1, cond2, expr2, ..., condN, exprN, exprf)",
+            0,
+            "interleaved",
+        ),
+        ("sum(x1)", 0, "interleaved"),
+        ("sum", 0, "interleaved"),
+    ],
+)
+def test_get_group_layout(signature: str, head_length: int, expected: str):
+    assert get_group_layout(signature, head_length) == expected
+
+
+def test_fixed_and_optional_parameters():
+    entry = build_calc_entry(
+        calc(
+            "delta(xvr, n, m)",
+            ("xvr", "1", "xvr"),
+            ("n", "?", "int"),
+            ("m", "?", "int"),
+        )
+    )
+
+    assert entry == {
+        "minArity": 1,
+        "maxArity": 3,
+        "optional": 2,
+        "head": [["xvr"], ["int"], ["int"]],
+        "variadic": None,
+        "tail": [],
+    }
+
+
+def test_fixed_parameters_with_a_count():
+    entry = build_calc_entry(calc("pos(x, y, z)", ("v", "3", "value")))
+
+    assert entry["minArity"] == entry["maxArity"] == 3
+    assert entry["head"] == [["value"]] * 3
+
+
+def test_variadic_group_with_a_count_in_blocks():
+    entry = build_calc_entry(
+        calc(
+            "avgselection(n, v1, v2, ..., vN, use1, use2, ..., useN)",
+            ("n", "1", "int"),
+            ("vN", "$n", "value"),
+            ("useN", "$n", "bool"),
+        )
+    )
+
+    assert entry == {
+        "minArity": 3,
+        "maxArity": None,
+        "optional": 0,
+        "head": [["int"]],
+        "variadic": {
+            "parameters": ["vN", "useN"],
+            "datatypes": [["value"], ["bool"]],
+            "count": "n",
+            "layout": "blocks",
+        },
+        "tail": [],
+    }
+
+
+def test_interleaved_variadic_group_with_a_tail():
+    entry = build_calc_entry(
+        calc(
+            "ifelif(cond1, expr1, cond2, expr2, ..., condN, exprN, exprf)",
+            ("condn", "+", "bool"),
+            ("exprn", "=condN", "value"),
+            ("exprf", "1", "value"),
+        )
+    )
+
+    assert entry["minArity"] == 3
+    assert entry["maxArity"] is None
+    assert entry["head"] == []
+    assert entry["tail"] == [["value"]]
+    assert entry["variadic"]["parameters"] == ["condn", "exprn"]
+    assert entry["variadic"]["count"] is None
+    assert entry["variadic"]["layout"] == "interleaved"
+
+
+def test_single_variadic_parameter_is_interleaved():
+    entry = build_calc_entry(calc("max(x1, x2, ...)", ("x", "+", "value")))
+
+    assert entry["minArity"] == 1
+    assert entry["variadic"]["layout"] == "interleaved"
+
+
+@pytest.mark.parametrize(
+    "parameters, message",
+    [
+        (
+            (("x", "?", "value"), ("y", "1", "value")),
+            "Optional parameters of f are not last",
+        ),
+        (
+            (("x", "+", "value"), ("y", "?", "value")),
+            "Optional parameters of f are not last",
+        ),
+        (
+            (("x", "+", "value"), ("y", "1", "value"), ("z", "+", "value")),
+            "Variadic parameters of f are not grouped",
+        ),
+        ((("x", "*", "value"),), "Unknown arity '\\*' of parameter x in f"),
+    ],
+)
+def test_invalid_parameters(parameters: tuple, message: str):
+    with pytest.raises(Exception, match=message):
+        build_calc_entry(calc("f(x, y, z)", *parameters))
+
+
+def test_calcs_that_can_not_be_indexed_are_left_out(capsys: pytest.CaptureFixture):
+    index = build_calc_index(
+        [
+            calc("abs(x)", ("x", "1", "value")),
+            calc("star(x)", ("x", "*", "value")),
+            calc("abs(x, y)", ("x", "1", "value"), ("y", "1", "value")),
+        ]
+    )
+
+    assert list(index) == ["abs"]
+    assert index["abs"]["maxArity"] == 1
+    assert (
+        "Leaving star out of calcIndex.yaml: Unknown arity '*'"
+        in capsys.readouterr().out
+    )
@@ -0,0 +1,156 @@
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from src.deltas import (
+    apply_records,
+    deltas_folder_name,
+    diff_records,
+    materialize,
+    write_deltas,
+)
+from src.documentation import write_yaml_list
+
+nested = ("attributes", "name")
+
+
+def obj(name: str, description: str = "", *attributes: str) -> dict:
+    return {
+        "name": name,
+        "description": description,
+        "attributes": [{"name": x, "dataType": "int"} for x in attributes],
+    }
+
+
+def round_trip(base: List[dict], target: List[dict]) -> dict:
+    delta = diff_records(base, target, "name", nested)
+    assert apply_records(base, delta, "name", nested) == target
+    return delta
+
+
+def test_unchanged_records_give_an_empty_delta():
+    records = [obj("Evr"), obj("Mvr")]
+
+    assert round_trip(records, [dict(x) for x in records]) == {}
+
+
+def test_added_and_removed_records():
+    delta = round_trip([obj("Evr"), obj("Mvr")], [obj("Evr"), obj("Cvr")])
+
+    assert delta == {"removed": [["Mvr", 0]], "added": [["Cvr", 0, obj("Cvr")]]}
+
+
+def test_changed_fields_are_set_and_missing_fields_unset():
+    base = [{"name": "Evr", "description": "Old", "tags": ["basic"]}]
+    target = [{"name": "Evr", "description": "New", "unit": "m"}]
+
+    delta = round_trip(base, target)
+
+    assert delta == {
+        "changed": [
+            ["Evr", 0, {"set": {"description": "New", "unit": "m"}, "unset": ["tags"]}]
+        ]
+    }
+
+
+def test_changed_nested_records():
+    base = [obj("Evr", "", "Text1", "Meas")]
+    target = [obj("Evr", "", "Meas", "Text2")]
+    target[0]["attributes"][0]["dataType"] = "float"
+
+    delta = round_trip(base, target)
+
+    assert delta["changed"][0][2] == {
+        "nested": {
+            "removed": [["Text1", 0]],
+            "added": [["Text2", 0, {"name": "Text2", "dataType": "int"}]],
+            "changed": [["Meas", 0, {"set": {"dataType": "float"}}]],
+        }
+    }
+
+
+def test_nested_records_set_when_the_base_has_none():
+    base = [{"name": "Evr"}]
+    target = [obj("Evr", "", "Meas")]
+
+    delta = round_trip(base, target)
+
+    assert delta["changed"][0][2]["set"]["attributes"] == target[0]["attributes"]
+
+
+def test_reordered_records():
+    delta = round_trip([obj("A"), obj("B"), obj("C")], [obj("C"), obj("A"), obj("B")])
+
+    assert delta == {"order": [["C", 0], ["A", 0], ["B", 0]]}
+
+
+def test_added_records_in_the_middle_are_ordered():
+    delta = round_trip([obj("A"), obj("C")], [obj("A"), obj("B"), obj("C")])
+
+    assert delta["added"] == [["B", 0, obj("B")]]
+    assert delta["order"] == [["A", 0], ["B", 0], ["C", 0]]
+
+
+@pytest.mark.parametrize(
+    "target",
+    [
+        [obj("Evr", "first"), obj("Evr", "second"), obj("Evr", "third")],
+        [obj("Evr", "second")],
+        [obj("Evr", "second"), obj("Evr", "first")],
+        [obj("Mvr"), obj("Evr", "first")],
+        [obj("Evr", "first"), obj("Mvr"), obj("Evr", "changed")],
+    ],
+)
+def test_duplicate_names(target: List[dict]):
+    base = [obj("Evr", "first"), obj("Mvr"), obj("Evr", "second")]
+
+    round_trip(base, target)
+
+
+def test_duplicate_names_are_told_apart_by_their_position():
+    base = [obj("Evr", "first"), obj("Evr", "second")]
+
+    delta = round_trip(base, [obj("Evr", "first"), obj("Evr", "changed")])
+
+    assert delta == {"changed": [["Evr", 1, {"set": {"description": "changed"}}]]}
+
+
+def write_version(output_path: Path, version: str, objects: List[dict]):
+    version_path = output_path / version
+    version_path.mkdir(parents=True)
+    write_yaml_list(objects, version_path / "objectsDoc.yaml")
+    write_yaml_list([{"name": "abs", "parameters": []}], version_path / "calcs.yaml")
+    write_yaml_list([{"prefix": "evr", "body": "Evr:"}], version_path / "snippets.yaml")
+
+
+def test_materialize_rebuilds_the_versions(tmp_path: Path):
+    write_version(tmp_path, "latest", [obj("Evr", "", "Meas"), obj("Cvr")])
+    write_version(tmp_path, "v3_8", [obj("Evr", "Old", "Meas", "Text1")])
+
+    write_deltas(tmp_path, ["latest", "v3_8"])
+    deltas_path = tmp_path / deltas_folder_name
+
+    assert materialize(deltas_path, "v3_8")["objects"] == [
+        obj("Evr", "Old", "Meas", "Text1")
+    ]
+    assert materialize(deltas_path, "latest")["objects"] == [
+        obj("Evr", "", "Meas"),
+        obj("Cvr"),
+    ]
+
+
+def test_materialize_returns_a_copy_of_the_base(tmp_path: Path):
+    write_version(tmp_path, "latest", [obj("Evr", "", "Meas"), obj("Cvr")])
+    write_version(tmp_path, "v3_8", [obj("Evr", "", "Meas")])
+    write_deltas(tmp_path, ["latest", "v3_8"])
+    deltas_path = tmp_path / deltas_folder_name
+
+    materialize(deltas_path, "latest")["objects"].clear()
+    materialize(deltas_path, "v3_8")["objects"][0]["attributes"].clear()
+
+    assert materialize(deltas_path, "latest")["objects"] == [
+        obj("Evr", "", "Meas"),
+        obj("Cvr"),
+    ]
+    assert materialize(deltas_path, "v3_8")["objects"] == [obj("Evr", "", "Meas")]
@@ -0,0 +1,56 @@
+from pathlib import Path
+
+from src.documentation import read_calcs, read_objects
+from src.parse_doxygen import Parameter, RecordPool
+
+public_path = Path(__file__).parent.parent.parent / "packages/septic/public"
+
+
+def test_pool_shares_identical_records():
+    pool = RecordPool()
+
+    first = pool.create(
+        Parameter,
+        name="x",
+        description="Value",
+        direction="in",
+        datatype=["value"],
+        arity="1",
+    )
+    second = pool.create(
+        Parameter,
+        name="x",
+        description="Value",
+        direction="in",
+        datatype=("value",),
+        arity="1",
+    )
+    other = pool.create(
+        Parameter,
+        name="x",
+        description="Value",
+        direction="in",
+        datatype=["int"],
+        arity="1",
+    )
+
+    assert first is second
+    assert other is not first
+    assert first.datatype == ("value",)
+
+
+def test_versions_read_through_a_pool_share_their_records():
+    pool = RecordPool()
+
+    old = {
+        x.name: x for x in read_objects(public_path / "v3_7" / "objectsDoc.yaml", pool)
+    }
+    new = {
+        x.name: x for x in read_objects(public_path / "v3_8" / "objectsDoc.yaml", pool)
+    }
+    calcs = read_calcs(public_path / "v3_8" / "calcs.yaml", pool)
+
+    shared = [name for name in old if name in new and old[name] == new[name]]
+    assert shared
+    assert all(old[name] is new[name] for name in shared)
+    assert all(isinstance(x, Parameter) for calc in calcs for x in calc.parameters)
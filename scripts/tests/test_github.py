@@ -0,0 +1,115 @@
+import pytest
+
+import src.github as github
+from conftest import GitHubStandIn, GitRepo, evr_file, system_file
+
+dir_path = "/repos/equinor/SEPTIC/contents/src?"
+file_path = "/repos/equinor/SEPTIC/contents/src/"
+
+
+def test_get_object_files_fetches_the_documented_files(
+    github_api: GitHubStandIn, septic_repo: GitRepo
+):
+    commit = septic_repo.git("rev-parse", "v3.7.0").strip()
+
+    files = list(github.get_object_files(commit, workers=2))
+
+    assert sorted(files) == sorted([evr_file, system_file])
+    assert github.get_calc_file(commit).startswith("/*!\n  \\class CalcAbs")
+
+
+def test_get_object_files_reuses_the_source_cache(
+    github_api: GitHubStandIn, septic_repo: GitRepo
+):
+    commit = septic_repo.git("rev-parse", "v3.7.0").strip()
+    list(github.get_object_files(commit))
+    fetched = github_api.statuses(file_path)
+    github.get_dir.cache_clear()
+
+    list(github.get_object_files(commit))
+
+    assert github_api.statuses(file_path) == fetched
+    assert github_api.statuses(dir_path) == [200, 304]
+
+
+def test_get_object_files_reports_the_files_it_failed_to_fetch(
+    github_api: GitHubStandIn, septic_repo: GitRepo, monkeypatch: pytest.MonkeyPatch
+):
+    commit = septic_repo.git("rev-parse", "v3.7.0").strip()
+    get_file_content = github.get_file_content
+
+    def fail_evr(ref: str, path: str) -> bytes:
+        if path == "src/evr.cpp":
+            raise Exception("connection reset")
+        return get_file_content(ref, path)
+
+    monkeypatch.setattr(github, "get_file_content", fail_evr)
+
+    with pytest.raises(Exception, match="src/evr.cpp: connection reset"):
+        list(github.get_object_files(commit))
+
+
+def test_conditional_requests_are_answered_from_the_response_cache(
+    github_api: GitHubStandIn, septic_repo: GitRepo
+):
+    tags = github.get_tags()
+    commit = github.get_commit_id("main")
+
+    assert github.get_tags() == tags
+    assert github.get_commit_id("main") == commit
+    assert github_api.statuses("/repos/equinor/SEPTIC/tags") == [200, 304]
+    assert github_api.statuses("/repos/equinor/SEPTIC/branches/main") == [200, 304]
+
+
+def test_conditional_requests_pick_up_changes(
+    github_api: GitHubStandIn, septic_repo: GitRepo
+):
+    github.get_tags()
+    commit = septic_repo.commit({"README.md": "SEPTIC 3.8\n"}, "Release", "v3.8.0")
+
+    tags = github.get_tags()
+
+    assert {"name": "v3.8.0", "commit": {"sha": commit}} in tags
+    assert github_api.statuses("/repos/equinor/SEPTIC/tags") == [200, 200]
+
+
+@pytest.mark.parametrize("count, pages", [(4, 3), (5, 3)])
+def test_tags_are_fetched_from_every_page(
+    github_api: GitHubStandIn,
+    septic_repo: GitRepo,
+    monkeypatch: pytest.MonkeyPatch,
+    count: int,
+    pages: int,
+):
+    monkeypatch.setattr(github, "page_size", 2)
+    names = ["v3.7.0"] + [f"v3.{minor}.0" for minor in range(8, 7 + count)]
+    for name in names[1:]:
+        septic_repo.git("tag", name)
+
+    tags = github.get_tags()
+
+    assert sorted(x["name"] for x in tags) == sorted(names)
+    requests = [
+        x for x, _ in github_api.requests if x.startswith("/repos/equinor/SEPTIC/tags")
+    ]
+    assert [x.split("page=")[-1] for x in requests] == [
+        str(x) for x in range(1, pages + 1)
+    ]
+
+
+def test_rate_limited_requests_are_retried(github_api: GitHubStandIn):
+    github_api.rate_limited = 2
+
+    tags = github.get_tags()
+
+    assert [x["name"] for x in tags] == ["v3.7.0"]
+    assert github_api.statuses("/repos/equinor/SEPTIC/tags") == [403, 403, 200]
+
+
+def test_rate_limited_requests_give_up_after_the_retries(
+    github_api: GitHubStandIn,
+):
+    github_api.rate_limited = github.max_rate_limit_retries + 1
+
+    with pytest.raises(Exception, match="GitHub responded with 403"):
+        github.get_commit_id("main")
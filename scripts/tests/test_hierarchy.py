@@ -0,0 +1,63 @@
+from typing import List
+
+import pytest
+
+from src.hierarchy import build_hierarchy, validate_hierarchy
+
+
+def obj(name: str, *parents: str) -> dict:
+    return {"name": name, "parents": list(parents) or None}
+
+
+def get_parents(objects: List[dict]) -> dict:
+    return {x["name"]: list(x["parents"] or []) for x in objects}
+
+
+def test_build_hierarchy():
+    hierarchy = build_hierarchy(
+        [
+            obj("System"),
+            obj("SopcProc", "System"),
+            obj("DmmyAppl", "System"),
+            obj("Evr", "SopcProc", "DmmyAppl"),
+            obj("Table", "DmmyAppl"),
+            obj("Mvr", "SopcProc"),
+        ]
+    )
+
+    assert hierarchy["roots"] == ["System"]
+    assert hierarchy["objects"]["System"] == {
+        "children": ["SopcProc", "DmmyAppl"],
+        "ancestors": [],
+        "descendants": ["SopcProc", "DmmyAppl", "Evr", "Mvr", "Table"],
+    }
+    assert hierarchy["objects"]["Evr"] == {
+        "children": [],
+        "ancestors": ["SopcProc", "DmmyAppl", "System"],
+        "descendants": [],
+    }
+    assert hierarchy["objects"]["DmmyAppl"]["children"] == ["Evr", "Table"]
+
+
+def test_build_hierarchy_lists_every_root():
+    hierarchy = build_hierarchy([obj("System"), obj("Evr", "System"), obj("Display")])
+
+    assert hierarchy["roots"] == ["System", "Display"]
+    assert hierarchy["objects"]["Display"]["ancestors"] == []
+
+
+def test_validate_hierarchy_reports_unknown_containers():
+    objects = [obj("System"), obj("Evr", "System", "SopcProc", "UAProc")]
+
+    with pytest.raises(Exception, match="Evr has unknown containers SopcProc, UAProc"):
+        validate_hierarchy(objects, get_parents(objects))
+
+
+def test_validate_hierarchy_reports_cycles():
+    objects = [obj("System"), obj("A", "System", "B"), obj("B", "A")]
+
+    with pytest.raises(Exception) as error:
+        validate_hierarchy(objects, get_parents(objects))
+
+    assert "A is contained in itself" in str(error.value)
+    assert "B is contained in itself" in str(error.value)
@@ -0,0 +1,194 @@
+from pathlib import Path
+
+import pytest
+
+from benchmark import create_fixture, parse_calcs, parse_objects, public_path
+import src.parse_doxygen as parse_doxygen
+from src.documentation import to_value, write_yaml_list
+from src.parse_doxygen import parse_calc_documentation, parse_object_documentation
+
+object_file = r"""
+int x; /* plain comment */
+/*!
+  \vscode Evr
+
+  \brief Entered value,
+  spanning two lines
+
+  \param Text1 First text {datatype: String; default: ""} [basic]
+  \param Meas Measured
+  value over lines {datatype: Float; default: 0.0; postfix: [a, b]; calc}
+  \param Mode Mode {datatype: Enum[Off, On]; default: Off; nosnippet}
+  \param Tags Tags {datatype: Int[]; default: [1, 2]; nocnfg} [advanced, hidden]
+  \param Snip Snip {datatype: String; snippet: 'a\nb'}
+
+  \containers [DmmyAppl, SopcProc]
+*/
+/*! \brief Not an object */
+"""
+
+calc_file = r"""
+/*!
+  \class CalcAbs
+  \calc{abs(x)}
+
+  \param[in] x Value {datatype: [float, int]; arity: 1}
+
+  \return The absolute value
+
+  \details Multi
+  line details
+
+  \quality Same as x
+*/
+/*!
+  \class CalcSum
+  \calc{sum(x1, x2, ...)}
+  \param[in] x Values
+  over two lines {datatype: [float]; arity: +}
+  \return Sum
+  \quality GOOD
+*/
+/*!
+  \class CalcNone
+  \calc{none()}
+  \return Nothing
+*/
+/*! \class NotACalc */
+"""
+
+
+def attribute(name: str, description: str, data_type: str, **fields) -> dict:
+    return {
+        "name": name,
+        "description": description,
+        "dataType": data_type,
+        "list": False,
+        "enums": [],
+        "default": [],
+        "postfix": [],
+        "snippet": "",
+        "calc": False,
+        "noCnfg": False,
+        "nosnippet": False,
+        "tags": [],
+        **fields,
+    }
+
+
+def calc(name: str, signature: str, parameters: list, **fields) -> dict:
+    return {
+        "name": name,
+        "signature": signature,
+        "parameters": parameters,
+        "retr": "",
+        "detailedDescription": "",
+        "quality": "",
+        **fields,
+    }
+
+
+def parameter(name: str, description: str, datatype: list, arity: str) -> dict:
+    return {
+        "name": name,
+        "description": description,
+        "direction": "in",
+        "datatype": datatype,
+        "arity": arity,
+    }
+
+
+def test_parse_object_documentation():
+    objects = to_value(parse_object_documentation(object_file))
+
+    assert objects == [
+        {
+            "name": "Evr",
+            "description": "Entered value,\n  spanning two lines",
+            "parents": ["DmmyAppl", "SopcProc"],
+            "attributes": [
+                attribute(
+                    "Text1", "First text", "string", default=['""'], tags=["basic"]
+                ),
+                attribute(
+                    "Meas",
+                    "Measured\n  value over lines",
+                    "float",
+                    default=["0.0"],
+                    postfix=["a", "b"],
+                    calc=True,
+                ),
+                attribute(
+                    "Mode",
+                    "Mode",
+                    "enum",
+                    enums=["Off", "On"],
+                    default=["Off"],
+                    nosnippet=True,
+                ),
+                attribute(
+                    "Tags",
+                    "Tags",
+                    "int",
+                    list=True,
+                    default=["1", "2"],
+                    noCnfg=True,
+                    tags=["advanced", "hidden"],
+                ),
+                attribute("Snip", "Snip", "string", snippet="a\\nb"),
+            ],
+        }
+    ]
+
+
+def test_parse_calc_documentation():
+    calcs = to_value(parse_calc_documentation(calc_file))
+
+    assert calcs == [
+        calc(
+            "abs",
+            "abs(x)",
+            [parameter("x", "Value", ["float", "int"], "1")],
+            retr="The absolute value",
+            detailedDescription="Multi\n  line details",
+            quality="Same as x",
+        ),
+        calc(
+            "sum",
+            "sum(x1, x2, ...)",
+            [parameter("x", "Values\n  over two lines", ["float"], "+")],
+            retr="Sum",
+            quality="GOOD",
+        ),
+        calc("none", "none()", [], retr="Nothing"),
+    ]
+
+
+def test_carriage_returns_are_kept_in_multiline_text():
+    objects = to_value(parse_object_documentation(object_file.replace("\n", "\r\n")))
+    calcs = to_value(parse_calc_documentation(calc_file.replace("\n", "\r\n")))
+
+    assert objects[0]["description"] == "Entered value,\r\n  spanning two lines"
+    assert (
+        objects[0]["attributes"][1]["description"] == "Measured\r\n  value over lines"
+    )
+    assert objects[0]["attributes"][2]["enums"] == ["Off", "On"]
+    assert calcs[0]["detailedDescription"] == "Multi\r\n  line details"
+    assert calcs[1]["parameters"][0]["datatype"] == ["float"]
+
+
+@pytest.mark.parametrize("version", ["v3_6", "v3_7", "v3_8", "latest"])
+def test_sources_rendered_from_a_version_reproduce_its_files(
+    version: str, tmp_path: Path
+):
+    object_files, calc_source = create_fixture(1, version)
+    objects = to_value(parse_objects(object_files))
+    calcs = parse_calcs(calc_source)
+    calcs = to_value(list(filter(parse_doxygen.test_calc, calcs)))
+
+    write_yaml_list(objects, tmp_path / "objectsDoc.yaml")
+    write_yaml_list(calcs, tmp_path / "calcs.yaml")
+
+    for name in ("objectsDoc.yaml", "calcs.yaml"):
+        expected = (public_path / version / name).read_bytes()
+        assert (tmp_path / name).read_bytes() == expected
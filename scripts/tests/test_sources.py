@@ -0,0 +1,179 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from conftest import GitHubStandIn, GitRepo, calc_file, evr_file, system_file
+from src.sources import (
+    ArchiveSource,
+    ContentsSource,
+    LocalGitSource,
+    LocalSource,
+    get_source,
+)
+
+
+@pytest.fixture
+def git_source(septic_repo: GitRepo):
+    source = LocalGitSource(septic_repo.path)
+    yield source
+    source.close()
+
+
+def test_get_source_reads_a_local_clone(septic_repo: GitRepo):
+    source = get_source(f"git:{septic_repo.path}")
+
+    assert isinstance(source, LocalGitSource)
+    assert source.path == septic_repo.path
+
+
+def test_local_git_source_lists_tags_and_commits(
+    git_source: LocalGitSource, septic_repo: GitRepo
+):
+    tag_commit = septic_repo.git("rev-parse", "v3.7.0").strip()
+    main_commit = septic_repo.git("rev-parse", "main").strip()
+
+    assert git_source.get_tags() == [{"name": "v3.7.0", "commit": {"sha": tag_commit}}]
+    assert git_source.get_tag_commit("v3.7.0") == tag_commit
+    assert git_source.get_tag_commit("v3.8.0") is None
+    assert git_source.get_commit_id("main") == main_commit
+
+
+def test_local_git_source_resolves_annotated_tags(
+    git_source: LocalGitSource, septic_repo: GitRepo
+):
+    septic_repo.git("tag", "-a", "v3.7.1", "-m", "Release 3.7.1", "v3.7.0")
+
+    assert git_source.get_tag_commit("v3.7.1") == git_source.get_tag_commit("v3.7.0")
+
+
+def test_local_git_source_reads_the_files_of_a_ref(
+    git_source: LocalGitSource, septic_repo: GitRepo
+):
+    objects = list(git_source.get_object_files("v3.7.0"))
+
+    assert sorted(objects) == sorted([evr_file, system_file])
+    assert git_source.get_calc_file("v3.7.0") == calc_file
+    assert evr_file.replace("First", "The first") in git_source.get_object_files("main")
+
+
+def test_local_git_source_reports_a_missing_calc_file(
+    git_source: LocalGitSource, septic_repo: GitRepo
+):
+    septic_repo.commit({"src/calc.cpp": None}, "Remove calcs", tag="v4.0.0")
+
+    with pytest.raises(Exception, match="src/calc.cpp not found in v4.0.0"):
+        git_source.get_calc_file("v4.0.0")
+
+
+def test_local_git_source_refresh_finds_new_tags(
+    git_source: LocalGitSource, septic_repo: GitRepo
+):
+    assert git_source.get_tag_commit("v3.8.0") is None
+    commit = septic_repo.commit({"README.md": "SEPTIC 3.8\n"}, "Release", "v3.8.0")
+
+    git_source.refresh()
+
+    assert git_source.get_tag_commit("v3.8.0") == commit
+
+
+def test_local_git_source_close_stops_the_batch_process(git_source: LocalGitSource):
+    git_source.get_calc_file("v3.7.0")
+    batch = git_source.batch
+
+    git_source.close()
+
+    assert batch.returncode == 0
+    assert git_source.batch is None
+    assert git_source.get_calc_file("v3.7.0") == calc_file
+
+
+@pytest.mark.parametrize("source_type", [ContentsSource, ArchiveSource])
+def test_github_sources_match_the_local_clone(
+    source_type, github_api: GitHubStandIn, git_source: LocalGitSource
+):
+    source = source_type()
+
+    assert source.get_tags() == git_source.get_tags()
+    assert source.get_commit_id("main") == git_source.get_commit_id("main")
+    for ref in ("v3.7.0", "main"):
+        commit = git_source.get_tag_commit(ref) or git_source.get_commit_id(ref)
+        assert sorted(source.get_object_files(commit)) == sorted(
+            git_source.get_object_files(commit)
+        )
+        assert source.get_calc_file(commit) == git_source.get_calc_file(commit)
+
+
+def test_local_source_only_knows_the_tags_of_the_checkout(septic_repo: GitRepo):
+    source = LocalSource(septic_repo.path)
+
+    assert source.get_tag_commit("v3.7.0") is None
+    assert source.get_tag_commit("v9.9.9") is None
+
+    septic_repo.git("checkout", "-q", "v3.7.0")
+    source.refresh()
+
+    assert (
+        source.get_tag_commit("v3.7.0") == septic_repo.git("rev-parse", "HEAD").strip()
+    )
+    assert source.get_tag_commit("v9.9.9") is None
+
+
+def test_local_source_checks_the_branch_of_the_checkout(septic_repo: GitRepo):
+    source = LocalSource(septic_repo.path)
+
+    assert source.get_commit_id("main") == septic_repo.git("rev-parse", "main").strip()
+    with pytest.raises(Exception, match="Branch develop not found"):
+        source.get_commit_id("develop")
+
+    septic_repo.git("checkout", "-q", "v3.7.0")
+    source.refresh()
+
+    with pytest.raises(Exception, match="not checked out at main"):
+        source.get_commit_id("main")
+
+
+def test_local_source_takes_a_tarball_to_be_of_the_given_ref(
+    septic_repo: GitRepo, tmp_path: Path
+):
+    tarball = tmp_path / "SEPTIC-v3.7.0.tar.gz"
+    septic_repo.git("archive", "--format=tar.gz", "-o", str(tarball), "v3.7.0")
+    source = LocalSource(tarball)
+
+    assert source.get_tags() == []
+    assert (
+        source.get_tag_commit("v3.7.0")
+        == septic_repo.git("rev-parse", "v3.7.0").strip()
+    )
+    assert source.get_calc_file("v3.7.0") == calc_file
+
+
+def test_main_needs_the_ref_of_a_tarball(septic_repo: GitRepo, tmp_path: Path):
+    tarball = tmp_path / "SEPTIC.tar.gz"
+    septic_repo.git("archive", "--format=tar.gz", "-o", str(tarball), "main")
+    main_path = Path(__file__).parent.parent / "main.py"
+
+    result = subprocess.run(
+        [sys.executable, str(main_path), "--source", str(tarball)],
+        cwd=tmp_path,
+        capture_output=True,
+        text=True,
+    )
+
+    assert result.returncode == 2
+    assert "only holds the files of one ref" in result.stderr
+
+
+def test_local_git_source_prefers_the_fetched_branch(
+    septic_repo: GitRepo, tmp_path: Path
+):
+    clone = GitRepo(tmp_path / "clone", septic_repo)
+    source = LocalGitSource(clone.path)
+    commit = septic_repo.commit({"README.md": "SEPTIC 3.9\n"}, "Update")
+
+    clone.git("fetch", "-q")
+
+    assert source.get_commit_id("main") == commit
+    assert clone.git("rev-parse", "main").strip() != commit
+    source.close()
@@ -0,0 +1,177 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+import yaml
+
+import main
+from conftest import GitHubStandIn, GitRepo, calc_file
+from generate_examples import default_output_dir
+from src.sources import ContentsSource, LocalGitSource
+
+package_path = Path("packages/extension/package.json")
+version_option = "septic.documentation.version"
+
+
+@pytest.fixture
+def workspace(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Repository root with an empty documentation folder"""
+    path = tmp_path / "vscode-septic"
+    (path / main.output_path).mkdir(parents=True)
+    (path / package_path).parent.mkdir(parents=True)
+    package = {"contributes": {"configuration": {"properties": {version_option: {}}}}}
+    (path / package_path).write_text(json.dumps(package))
+    monkeypatch.chdir(path)
+    return path
+
+
+@pytest.fixture
+def git_source(septic_repo: GitRepo, monkeypatch: pytest.MonkeyPatch):
+    source = LocalGitSource(septic_repo.path)
+    monkeypatch.setattr(main, "source", source)
+    monkeypatch.setattr(main, "updated_folders", [])
+    monkeypatch.setattr(main, "force", False)
+    yield source
+    source.close()
+
+
+def get_version_options() -> list:
+    package = json.loads(package_path.read_text())
+    return package["contributes"]["configuration"]["properties"][version_option]["enum"]
+
+
+def get_meta_commit(folder_name: str) -> str:
+    with open(main.output_path / folder_name / "meta.yaml") as file:
+        return yaml.safe_load(file)["commit"]
+
+
+def test_poll_updates_the_folders_of_tags_and_main(workspace: Path, git_source):
+    folders = main.poll_documentation()
+
+    assert [x.name for x in folders] == ["v3_7", "latest"]
+    for folder_path in folders:
+        for name in ("objectsDoc.yaml", "calcs.yaml", "snippets.yaml", "meta.yaml"):
+            assert (folder_path / name).exists()
+    assert get_version_options() == ["latest", "v3.7"]
+    assert sorted(x.name for x in Path(default_output_dir).iterdir()) == [
+        "evr.cnfg",
+        "system.cnfg",
+    ]
+
+
+def test_poll_only_updates_what_changed(
+    workspace: Path, git_source, septic_repo: GitRepo
+):
+    main.poll_documentation()
+
+    assert main.poll_documentation() == []
+
+    commit = septic_repo.commit({"README.md": "SEPTIC 3.8\n"}, "Release", "v3.8.0")
+    folders = main.poll_documentation()
+
+    assert [x.name for x in folders] == ["v3_8", "latest"]
+    assert get_meta_commit("v3_8") == get_meta_commit("latest") == commit[0:7]
+    assert get_version_options() == ["latest", "v3.7", "v3.8"]
+
+
+def test_failing_tag_does_not_block_main(
+    workspace: Path, git_source, septic_repo: GitRepo
+):
+    septic_repo.commit({"src/calc.cpp": None}, "Remove calcs", tag="v4.0.0")
+    commit = septic_repo.commit({"src/calc.cpp": calc_file}, "Restore calcs")
+
+    with pytest.raises(Exception, match="Failed to update v4_0"):
+        main.poll_documentation()
+
+    assert not (main.output_path / "v4_0").exists()
+    assert get_meta_commit("latest") == commit[0:7]
+    assert get_version_options() == ["latest", "v3.7"]
+    assert Path(default_output_dir).exists()
+
+
+def test_folder_that_failed_is_updated_by_the_next_poll(
+    workspace: Path, git_source, monkeypatch: pytest.MonkeyPatch
+):
+    generate_snippets = main.generate_snippets
+
+    def fail_latest(version: str, *args):
+        if version == "latest":
+            raise Exception("disk full")
+        generate_snippets(version, *args)
+
+    monkeypatch.setattr(main, "generate_snippets", fail_latest)
+    with pytest.raises(Exception, match="disk full"):
+        main.poll_documentation()
+    assert not (main.output_path / "latest" / "meta.yaml").exists()
+    assert get_version_options() == ["v3.7"]
+
+    monkeypatch.setattr(main, "generate_snippets", generate_snippets)
+    folders = main.poll_documentation()
+
+    assert [x.name for x in folders] == ["latest"]
+    assert (main.output_path / "latest" / "snippets.yaml").exists()
+
+
+def test_idle_poll_of_the_contents_api_is_answered_with_304(
+    workspace: Path, github_api: GitHubStandIn, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setattr(main, "source", ContentsSource())
+    monkeypatch.setattr(main, "updated_folders", [])
+    monkeypatch.setattr(main, "force", False)
+    folders = main.poll_documentation()
+    assert [x.name for x in folders] == ["v3_7", "latest"]
+    start = len(github_api.requests)
+
+    assert main.poll_documentation() == []
+
+    requests = github_api.requests[start:]
+    assert sorted({url.split("?")[0] for url, _ in requests}) == [
+        "/repos/equinor/SEPTIC/branches/main",
+        "/repos/equinor/SEPTIC/tags",
+    ]
+    assert {status for _, status in requests} == {304}
+
+
+def test_watch_polls_from_the_command_line(
+    workspace: Path, septic_repo: GitRepo, cache_dir: Path
+):
+    result = subprocess.run(
+        [
+            sys.executable,
+            str(Path(main.__file__)),
+            "--source",
+            f"git:{septic_repo.path}",
+            "--watch",
+            "--interval",
+            "0",
+            "--polls",
+            "2",
+        ],
+        env={**os.environ, "SEPTIC_CACHE_DIR": str(cache_dir)},
+        capture_output=True,
+        text=True,
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert "Poll 1: updated v3_7, latest" in result.stdout
+    assert "Poll 2: no changes" in result.stdout
+
+
+def test_unknown_arity_only_leaves_the_calc_out_of_the_index(
+    workspace: Path, git_source, septic_repo: GitRepo
+):
+    septic_repo.commit(
+        {"src/calc.cpp": calc_file.replace("arity: 1", "arity: *")}, "Star"
+    )
+
+    main.poll_documentation()
+
+    latest_path = main.output_path / "latest"
+    with open(latest_path / "calcs.yaml") as file:
+        assert yaml.safe_load(file)[0]["parameters"][0]["arity"] == "*"
+    with open(latest_path / "calcIndex.yaml") as file:
+        assert yaml.safe_load(file) == {}
+    assert (latest_path / "meta.yaml").exists()